@@ -0,0 +1,95 @@
+"""
+Benchmark bulk session lookups by id: one giant `in.(...)` URL vs sb_get_in.
+
+Runs against a mock PostgREST (no network, no database) that charges a fixed
+round-trip latency per request plus a small per-row cost, and rejects URLs
+over a typical proxy limit with 414 like a real deployment would.
+
+    cd backend && python benchmarks/bench_bulk_lookup.py
+"""
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("SUPABASE_URL", "http://postgrest.mock")
+
+import httpx  # noqa: E402
+from fastapi import HTTPException  # noqa: E402
+import server  # noqa: E402
+
+RTT = 0.015            # seconds per request
+PER_ROW = 0.000002     # seconds of server work per returned row
+MAX_URL = 8192         # bytes, common proxy/PostgREST limit
+SIZES = [10, 100, 1000, 10000]
+RUNS = 5
+
+requests_made = 0
+
+
+async def mock_postgrest(request):
+    global requests_made
+    requests_made += 1
+    if len(str(request.url)) > MAX_URL:
+        return httpx.Response(414, text="URI Too Long")
+    if request.url.path.endswith("/rpc/sessions_by_ids"):
+        ids = json.loads(request.content)["ids"]
+    else:
+        ids = request.url.params["id"][len("in.("):-1].split(",")
+    await asyncio.sleep(RTT + PER_ROW * len(ids))
+    return httpx.Response(200, json=[{"id": i} for i in ids])
+
+
+async def naive(ids):
+    return await server.sb_get("contribution_sessions", {"select": "id", "id": f"in.({','.join(ids)})"})
+
+
+async def chunked(ids):
+    rpcs, server.SB_ID_LOOKUP_RPCS = server.SB_ID_LOOKUP_RPCS, {}
+    try:
+        return await server.sb_get_in("contribution_sessions", "id", ids, {"select": "id"})
+    finally:
+        server.SB_ID_LOOKUP_RPCS = rpcs
+
+
+async def rpc(ids):
+    return await server.sb_get_in("contribution_sessions", "id", ids, {"select": "id"})
+
+
+async def measure(fn, ids):
+    global requests_made
+    timings = []
+    for _ in range(RUNS):
+        requests_made = 0
+        start = time.perf_counter()
+        try:
+            rows = await fn(ids)
+            assert len(rows) == len(ids)
+        except (HTTPException, httpx.InvalidURL):
+            return "URL too long", requests_made
+        timings.append(time.perf_counter() - start)
+    return f"{statistics.median(timings) * 1000:8.1f} ms", requests_made
+
+
+async def main():
+    server._sb_client = httpx.AsyncClient(base_url=server.SB_BASE, transport=httpx.MockTransport(mock_postgrest))
+    print(f"mock RTT {RTT * 1000:.0f} ms, URL limit {MAX_URL} bytes, chunk size {server.SB_IN_CHUNK_SIZE}, "
+          f"concurrency {server.SB_IN_CONCURRENCY}, median of {RUNS} runs\n")
+    print(f"{'ids':>6} | {'single in.()':>22} | {'chunked':>22} | {'sb_get_in (rpc)':>22}")
+    for n in SIZES:
+        ids = [str(uuid.uuid4()) for _ in range(n)]
+        cells = []
+        for fn in (naive, chunked, rpc):
+            result, reqs = await measure(fn, ids)
+            cells.append(f"{result} ({reqs} req)")
+        print(f"{n:>6} | " + " | ".join(f"{c:>22}" for c in cells))
+    await server.close_sb_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,118 @@
+"""
+Benchmark the contributions CSV export on synthetic paid sessions.
+
+A mock PostgREST generates rows on demand (honouring limit and the keyset
+cursor), so the only memory that grows with the guest list is whatever the
+export itself holds. Compares the previous export (fetch everything, build
+one StringIO) with the streamed export: peak traced memory, time to first
+byte and total time.
+
+    cd backend && python benchmarks/bench_export.py
+"""
+import asyncio
+import csv
+import io
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("SUPABASE_URL", "http://postgrest.mock")
+
+import httpx  # noqa: E402
+import server  # noqa: E402
+
+SIZES = [10_000, 100_000]
+POTS = [{"id": str(uuid.UUID(int=i)), "title": f"Pot {i}"} for i in range(1, 4)]
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+total_rows = 0
+
+
+def synthetic_row(i, breakdown):
+    row = {
+        "id": str(uuid.UUID(int=i)), "created_at": (START + timedelta(seconds=i)).isoformat(),
+        "donor_name": f"Guest {i}", "donor_email": f"guest{i}@example.com", "donor_phone": f"98{i:08d}",
+        "donor_message": "Wishing you both a lifetime of happiness!", "total_amount_paise": 150000,
+        "fee_amount_paise": 3540, "status": "paid", "paid_at": (START + timedelta(seconds=i + 5)).isoformat(),
+        "razorpay_payment_id": f"pay_{i:014d}"
+    }
+    if breakdown:
+        row["allocations"] = [{"pot_id": POTS[i % 3]["id"], "amount_paise": 100000},
+                              {"pot_id": POTS[(i + 1) % 3]["id"], "amount_paise": 50000}]
+    return row
+
+
+def mock_postgrest(request):
+    if request.url.path.endswith("/pots"):
+        return httpx.Response(200, json=POTS)
+    params = request.url.params
+    limit = int(params.get("limit", total_rows))
+    before = re.search(r"id\.lt\.([0-9a-f-]{36})", params.get("and", ""))
+    top = uuid.UUID(before.group(1)).int - 1 if before else total_rows
+    breakdown = "allocations" in params.get("select", "")
+    rows = [synthetic_row(i, breakdown) for i in range(top, max(top - limit, 0), -1)]
+    return httpx.Response(200, content=json.dumps(rows).encode(), headers={"content-type": "application/json"})
+
+
+async def buffered_export():
+    """The export before streaming: every row fetched, then one StringIO."""
+    sessions = await server.sb_get("contribution_sessions", {
+        "select": "*", "status": "eq.paid", "order": "paid_at.desc.nullslast"
+    })
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(["Donor Name", "Email", "Phone", "Message", "Amount (INR)", "Fee (INR)", "Status", "Paid At",
+                     "Payment ID"])
+    for s in sessions:
+        writer.writerow([s["donor_name"], s.get("donor_email", ""), s.get("donor_phone", ""),
+                         s.get("donor_message", ""), s["total_amount_paise"] / 100,
+                         s.get("fee_amount_paise", 0) / 100, s.get("status", ""), s.get("paid_at", ""),
+                         s.get("razorpay_payment_id", "")])
+    yield output.getvalue().encode()
+
+
+async def streamed_export(breakdown=False, gzip=False):
+    request = SimpleNamespace(headers={"accept-encoding": "gzip"} if gzip else {})
+    response = await server.export_contributions(request, format="csv", status="paid", breakdown=breakdown, admin=None)
+    async for chunk in response.body_iterator:
+        yield chunk
+
+
+async def measure(name, export):
+    tracemalloc.start()
+    start = time.perf_counter()
+    first_byte = None
+    size = 0
+    async for chunk in export:
+        first_byte = first_byte or time.perf_counter() - start
+        size += len(chunk)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"  {name:<28} peak {peak / 1e6:7.1f} MB  first byte {first_byte * 1000:7.0f} ms  "
+          f"total {elapsed:5.2f} s  {size / 1e6:6.1f} MB out")
+
+
+async def main():
+    global total_rows
+    server._sb_client = httpx.AsyncClient(base_url=server.SB_BASE, transport=httpx.MockTransport(mock_postgrest))
+    print(f"page size {server.EXPORT_PAGE_SIZE}")
+    for n in SIZES:
+        total_rows = n
+        print(f"\n{n} paid sessions")
+        await measure("buffered (previous)", buffered_export())
+        await measure("streamed", streamed_export())
+        await measure("streamed + breakdown", streamed_export(breakdown=True))
+        await measure("streamed + breakdown + gzip", streamed_export(breakdown=True, gzip=True))
+    await server.close_sb_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
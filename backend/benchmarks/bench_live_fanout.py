@@ -0,0 +1,143 @@
+"""
+Load generator for /api/live: fan-out latency and slow-consumer shedding.
+
+Serves the real app with uvicorn on a background thread (PostgREST is
+mocked: no network, no database), connects N WebSocket clients from the
+main thread, then publishes timestamped messages through live_hub on the
+server's loop and records how long each one takes to reach every client.
+The second run stops reading on a few clients while large messages
+stream; they should be dropped while everyone else keeps up.
+
+Clients and server share one process (and its GIL), so the latencies
+are an upper bound for a worker with clients on other machines.
+
+    cd backend && python benchmarks/bench_live_fanout.py
+"""
+import asyncio
+import base64
+import json
+import logging
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("SUPABASE_URL", "http://postgrest.mock")
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from websockets.asyncio.client import connect  # noqa: E402
+from websockets.exceptions import ConnectionClosed  # noqa: E402
+import server  # noqa: E402
+
+CLIENTS = [100, 1000, 4000]
+MESSAGES = 20
+INTERVAL = 0.05           # seconds between published messages
+CONNECT_BATCH = 200       # connections opened at once
+SLOW_CLIENTS = 10
+SLOW_MESSAGES = 400
+SLOW_PAYLOAD = 32768      # bytes per message in the slow-consumer run
+
+
+def mock_postgrest(request):
+    if request.method == "HEAD":
+        return httpx.Response(200, headers={"content-range": "*/0"})
+    return httpx.Response(200, json=[])
+
+
+def start_server():
+    """Run the app on its own thread and event loop; returns (uvicorn server, loop, port)."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server._sb_client = httpx.AsyncClient(base_url=server.SB_BASE, transport=httpx.MockTransport(mock_postgrest))
+    uv = uvicorn.Server(uvicorn.Config(server.app, port=port, lifespan="off", log_level="warning", backlog=4096))
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_until_complete, args=(uv.serve(),), daemon=True).start()
+    while not uv.started:
+        time.sleep(0.05)
+    return uv, loop, port
+
+
+def publish(loop, data):
+    """Publish on the server's loop, as the payment hook would."""
+    loop.call_soon_threadsafe(server.live_hub.publish, "bench", data)
+
+
+async def connect_all(port, n):
+    async def one():
+        ws = await connect(f"ws://127.0.0.1:{port}/api/live", max_queue=None, open_timeout=60)
+        assert json.loads(await ws.recv())["type"] == "snapshot"
+        return ws
+    sockets = []
+    for start in range(0, n, CONNECT_BATCH):
+        sockets += await asyncio.gather(*(one() for _ in range(min(CONNECT_BATCH, n - start))))
+    return sockets
+
+
+async def read_messages(ws, count, latencies):
+    """Record delivery latencies; returns False if the server dropped this client."""
+    try:
+        for _ in range(count):
+            message = json.loads(await ws.recv())
+            latencies.append(time.perf_counter() - message["data"]["t"])
+    except ConnectionClosed:
+        return False
+    return True
+
+
+async def fan_out(loop, port, n):
+    sockets = await connect_all(port, n)
+    latencies = []
+    readers = [asyncio.create_task(read_messages(ws, MESSAGES, latencies)) for ws in sockets]
+    for seq in range(MESSAGES):
+        publish(loop, {"t": time.perf_counter(), "seq": seq})
+        await asyncio.sleep(INTERVAL)
+    await asyncio.wait_for(asyncio.gather(*readers), 120)
+    await asyncio.gather(*(ws.close() for ws in sockets))
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{n:>7} | {len(latencies):>10} | {statistics.median(latencies) * 1000:8.1f} ms | "
+          f"{p99 * 1000:8.1f} ms | {latencies[-1] * 1000:8.1f} ms")
+
+
+async def slow_consumers(loop, port, n):
+    sockets = await connect_all(port, n)
+    slow, healthy = sockets[:SLOW_CLIENTS], sockets[SLOW_CLIENTS:]
+    for ws in slow:
+        ws.transport.pause_reading()  # stalls like a phone that walked out of signal
+    latencies = []
+    readers = [asyncio.create_task(read_messages(ws, SLOW_MESSAGES, latencies)) for ws in healthy]
+    dropped_before = server.live_hub.dropped
+    padding = base64.b64encode(os.urandom(SLOW_PAYLOAD * 3 // 4)).decode()  # incompressible: defeats permessage-deflate
+    for seq in range(SLOW_MESSAGES):
+        publish(loop, {"t": time.perf_counter(), "seq": seq, "padding": padding})
+        await asyncio.sleep(0.02)
+    kept = await asyncio.wait_for(asyncio.gather(*readers), 120)
+    for ws in slow:
+        ws.transport.resume_reading()
+    await asyncio.gather(*(ws.close() for ws in sockets))
+    print(f"\n{SLOW_CLIENTS} stalled of {n} clients, {SLOW_MESSAGES} x {SLOW_PAYLOAD // 1024} KB messages, "
+          f"client buffer {server.LIVE_CLIENT_BUFFER}:")
+    print(f"  dropped {server.live_hub.dropped - dropped_before} (healthy clients dropped: {kept.count(False)}), "
+          f"healthy clients received {len(latencies)}/{len(healthy) * SLOW_MESSAGES}, "
+          f"p99 {sorted(latencies)[int(len(latencies) * 0.99) - 1] * 1000:.1f} ms")
+
+
+async def main():
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    uv, loop, port = start_server()
+    print(f"{MESSAGES} messages {INTERVAL * 1000:.0f} ms apart per run\n")
+    print(f"{'clients':>7} | {'deliveries':>10} | {'p50':>11} | {'p99':>11} | {'max':>11}")
+    for n in CLIENTS:
+        await fan_out(loop, port, n)
+    await slow_consumers(loop, port, 2 * SLOW_CLIENTS)
+    uv.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
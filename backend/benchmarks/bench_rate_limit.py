@@ -0,0 +1,78 @@
+"""
+Benchmark rate_limit stores with 100k distinct keys (one request per key, as in a crawl).
+
+Compares the old list-of-timestamps limiter with the token-bucket memory and
+SQLite stores: time per call, keys retained and memory held afterwards, and
+how many keys are left once every bucket has been idle for a full window.
+A second run has fewer keys calling up to the limit, where lists grow per call.
+
+    cd backend && python benchmarks/bench_rate_limit.py
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("SUPABASE_URL", "http://postgrest.mock")
+
+import server  # noqa: E402
+
+KEYS = 100_000
+MAX_REQ = 20
+WINDOW = 60
+
+
+class ListStore:
+    """The previous limiter: a list of timestamps per key, never evicted."""
+
+    def __init__(self):
+        self.store = defaultdict(list)
+
+    def take(self, key, max_req, window, now):
+        self.store[key] = [t for t in self.store[key] if now - t < window]
+        if len(self.store[key]) >= max_req:
+            return False
+        self.store[key].append(now)
+        return True
+
+    def __len__(self):
+        return len(self.store)
+
+
+def run(name, store, keys=KEYS, hits=1, now=1_000_000.0):
+    keys = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(keys)]
+    calls = [key for key in keys for _ in range(hits)]
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i, key in enumerate(calls):
+        store.take(key, MAX_REQ, WINDOW, now + i * 1e-4)
+    elapsed = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    held = len(store)
+    # One more caller after every bucket has gone idle for a full window
+    store.take("late-caller", MAX_REQ, WINDOW, now + len(calls) * 1e-4 + WINDOW + 1)
+    print(f"{name:<22} {elapsed / len(calls) * 1e6:8.2f} us/call  {held:>7} keys  "
+          f"{memory / 1e6:7.1f} MB  {len(store):>7} keys after idle window")
+
+
+def main():
+    print(f"{KEYS} distinct keys, limit {MAX_REQ}/{WINDOW}s\n")
+    run("list (previous)", ListStore())
+    run("token bucket memory", server.MemoryRateStore())
+    run("  capped at 10k keys", server.MemoryRateStore(max_keys=10_000))
+    with tempfile.TemporaryDirectory() as tmp:
+        server.RATE_LIMIT_SWEEP_SECONDS = 0
+        run("token bucket sqlite", server.SqliteRateStore(os.path.join(tmp, "rl.sqlite3")))
+
+    print(f"\n10000 keys making {MAX_REQ} calls each (timestamps pile up in the list store)\n")
+    run("list (previous)", ListStore(), keys=10_000, hits=MAX_REQ)
+    run("token bucket memory", server.MemoryRateStore(), keys=10_000, hits=MAX_REQ)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark event-loop responsiveness while Razorpay checkouts are in flight.
+
+Starts a local mock gateway (plain HTTP, fixed latency per order) and creates
+orders through the real SDK client: once by calling it straight from the event
+loop, as the handlers used to, and once through razorpay_call. A ticker task
+sleeps 10 ms in a loop; how late it wakes up is the latency every other
+request on the server would see.
+
+    cd backend && python benchmarks/bench_razorpay_calls.py
+"""
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("SUPABASE_URL", "http://postgrest.mock")
+
+import razorpay  # noqa: E402
+import server  # noqa: E402
+
+GATEWAY_LATENCY = 0.2  # seconds per order
+CHECKOUTS = 32
+TICK = 0.01
+
+
+class MockGateway(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(GATEWAY_LATENCY)
+        body = json.dumps({"id": f"order_{time.monotonic_ns()}", "status": "created"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+async def ticker(lags, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def blocking_order(client):
+    return client.order.create({"amount": 100, "currency": "INR"})
+
+
+async def pooled_order(client):
+    return await server.razorpay_call(client.order.create, {"amount": 100, "currency": "INR"})
+
+
+async def measure(name, create, client):
+    lags, stop = [], asyncio.Event()
+    tick = asyncio.create_task(ticker(lags, stop))
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    await asyncio.gather(*(create(client) for _ in range(CHECKOUTS)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    print(f"{name:<26} {elapsed:6.2f} s total  loop lag p50 {statistics.median(lags) * 1000:7.1f} ms  "
+          f"max {max(lags) * 1000:7.1f} ms")
+
+
+async def main():
+    gateway = ThreadingHTTPServer(("127.0.0.1", 0), MockGateway)
+    threading.Thread(target=gateway.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{gateway.server_port}"
+
+    client = server._new_razorpay_client()
+    client.base_url = base_url
+    print(f"{CHECKOUTS} concurrent orders, gateway latency {GATEWAY_LATENCY * 1000:.0f} ms, "
+          f"pool size {server.RAZORPAY_POOL_SIZE}\n")
+    await measure("sync SDK on the loop", blocking_order, razorpay.Client(auth=("k", "s"), base_url=base_url))
+    await measure("razorpay_call (pooled)", pooled_order, client)
+    gateway.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
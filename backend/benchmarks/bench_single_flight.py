@@ -0,0 +1,80 @@
+"""
+Benchmark upstream query count for a burst of identical public GETs.
+
+Fires N concurrent requests at /api/pots, /api/pots/{slug} and
+/api/blessings/all through the ASGI app against a mock PostgREST (fixed
+latency, request counter), with and without single-flight. The read-through
+and response caches start empty so only request coalescing is measured.
+
+    cd backend && python benchmarks/bench_single_flight.py
+"""
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("SUPABASE_URL", "http://postgrest.mock")
+
+import httpx  # noqa: E402
+import server  # noqa: E402
+
+RTT = 0.03  # seconds per upstream request
+CONCURRENCY = [1, 10, 100, 1000]
+PATHS = ["/api/pots", "/api/pots/kitchen", "/api/blessings/all"]
+
+upstream_requests = 0
+
+POT = {"id": "00000000-0000-0000-0000-000000000001", "title": "Kitchen", "slug": "kitchen", "is_active": True}
+
+
+async def mock_postgrest(request):
+    global upstream_requests
+    upstream_requests += 1
+    await asyncio.sleep(RTT)
+    table = request.url.path.rsplit("/", 1)[-1]
+    if table == "pots":
+        return httpx.Response(200, json=[POT])
+    if table == "contribution_sessions":
+        return httpx.Response(200, json=[{"id": "s", "donor_name": "Guest", "donor_message": "", "paid_at": None}])
+    return httpx.Response(200, json=[])
+
+
+async def burst(client, path, n):
+    global upstream_requests
+    upstream_requests = 0
+    server.public_cache.entries.clear()
+    start = time.perf_counter()
+    responses = await asyncio.gather(*(client.get(path) for _ in range(n)))
+    assert all(r.status_code == 200 for r in responses)
+    return upstream_requests, time.perf_counter() - start
+
+
+async def main():
+    server._sb_client = httpx.AsyncClient(base_url=server.SB_BASE, transport=httpx.MockTransport(mock_postgrest))
+    server.SB_CACHE_TABLE_TTLS = {}
+    server.PUBLIC_LIST_CACHE_TTL = 0
+    server.pot_totals.ready = True
+    shared = server.single_flight.do
+
+    async def unshared(key, fn):
+        return await fn()
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://app")
+    print(f"mock RTT {RTT * 1000:.0f} ms; upstream requests (wall time) per burst\n")
+    print(f"{'path':<20} {'concurrent':>10} | {'no single-flight':>22} | {'single-flight':>22}")
+    for path in PATHS:
+        for n in CONCURRENCY:
+            cells = []
+            for do in (unshared, shared):
+                server.single_flight.do = do
+                reqs, elapsed = await burst(client, path, n)
+                cells.append(f"{reqs:>6} ({elapsed * 1000:7.0f} ms)")
+            print(f"{path:<20} {n:>10} | {cells[0]:>22} | {cells[1]:>22}")
+    await client.aclose()
+    await server.close_sb_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -42,6 +42,11 @@ CREATE TABLE IF NOT EXISTS contribution_sessions (
   paid_at TIMESTAMPTZ
 );
 
+-- UPI flow columns (added after the first release)
+ALTER TABLE contribution_sessions ADD COLUMN IF NOT EXISTS payment_method TEXT DEFAULT 'razorpay';
+ALTER TABLE contribution_sessions ADD COLUMN IF NOT EXISTS utr TEXT;
+ALTER TABLE contribution_sessions ADD COLUMN IF NOT EXISTS submitted_at TIMESTAMPTZ;
+
 -- 4) Allocations table
 CREATE TABLE IF NOT EXISTS allocations (
   id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -69,6 +74,17 @@ CREATE TABLE IF NOT EXISTS site_settings (
   updated_at TIMESTAMPTZ DEFAULT now()
 );
 
+-- 7) Per-pot totals, kept current by triggers on allocations and contribution_sessions
+-- "Raised" = paid allocations; a session's status change is cascaded to its allocations
+CREATE TABLE IF NOT EXISTS pot_totals (
+  pot_id UUID PRIMARY KEY REFERENCES pots(id) ON DELETE CASCADE,
+  raised_paise BIGINT NOT NULL DEFAULT 0,
+  paid_count INTEGER NOT NULL DEFAULT 0,
+  contributor_count INTEGER NOT NULL DEFAULT 0,
+  contributor_names TEXT[] NOT NULL DEFAULT '{}',
+  updated_at TIMESTAMPTZ DEFAULT now()
+);
+
 -- Insert default UPI ID
 INSERT INTO site_settings (setting_key, setting_value) 
 VALUES ('upi_id', '8618052253@ybl')
@@ -87,8 +103,323 @@ CREATE INDEX IF NOT EXISTS idx_allocations_pot_id ON allocations(pot_id);
 CREATE INDEX IF NOT EXISTS idx_allocations_status ON allocations(status);
 CREATE INDEX IF NOT EXISTS idx_sessions_status ON contribution_sessions(status);
 CREATE INDEX IF NOT EXISTS idx_sessions_razorpay_order ON contribution_sessions(razorpay_order_id);
-CREATE INDEX IF NOT EXISTS idx_webhook_gateway ON webhook_events(gateway_event_id);
+-- Admin contributions: keyset pages on (created_at, id), optionally within a status or payment method
+CREATE INDEX IF NOT EXISTS idx_sessions_created_id ON contribution_sessions(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_sessions_status_created_id ON contribution_sessions(status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_sessions_method_created_id ON contribution_sessions(payment_method, created_at DESC, id DESC);
+-- Donor search: case-insensitive name prefix (trigram) and phone prefix
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_sessions_donor_name_trgm ON contribution_sessions USING gin (donor_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_sessions_donor_phone_prefix ON contribution_sessions(donor_phone text_pattern_ops);
+-- Unique so the webhook queue can insert batches with on_conflict=gateway_event_id
+-- Keeps the earliest copy of each event; id breaks ties between copies received at the same instant
+DELETE FROM webhook_events w USING webhook_events d
+  WHERE w.gateway_event_id = d.gateway_event_id
+    AND (COALESCE(w.received_at, 'infinity'), w.id) > (COALESCE(d.received_at, 'infinity'), d.id);
+DROP INDEX IF EXISTS idx_webhook_gateway;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_webhook_gateway_unique ON webhook_events(gateway_event_id);
 CREATE INDEX IF NOT EXISTS idx_settings_key ON site_settings(setting_key);
+CREATE INDEX IF NOT EXISTS idx_allocations_paid_pot ON allocations(pot_id, session_id) INCLUDE (amount_paise) WHERE status = 'paid';
+-- Blessings wall: newest-first keyset pages and since-deltas on (paid_at, id)
+CREATE INDEX IF NOT EXISTS idx_sessions_paid_feed ON contribution_sessions(paid_at DESC, id DESC) WHERE status = 'paid';
+
+-- Recompute one pot's row in pot_totals (paid sessions, distinct donor names, first 10 names)
+-- The row lock serialises concurrent payments to the same pot so no update is lost
+CREATE OR REPLACE FUNCTION refresh_pot_totals(p_pot_id UUID)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  INSERT INTO pot_totals (pot_id) VALUES (p_pot_id) ON CONFLICT (pot_id) DO NOTHING;
+  PERFORM 1 FROM pot_totals WHERE pot_id = p_pot_id FOR UPDATE;
+
+  WITH paid AS (
+    SELECT a.amount_paise, a.session_id,
+           COALESCE(NULLIF(s.donor_name, ''), 'Guest') AS donor_name, s.paid_at
+    FROM allocations a
+    JOIN contribution_sessions s ON s.id = a.session_id
+    WHERE a.pot_id = p_pot_id AND a.status = 'paid'
+  ),
+  names AS (
+    SELECT donor_name FROM paid
+    GROUP BY donor_name
+    ORDER BY MIN(paid_at) NULLS LAST, donor_name
+    LIMIT 10
+  )
+  UPDATE pot_totals t SET
+    raised_paise = agg.raised_paise,
+    paid_count = agg.paid_count,
+    contributor_count = agg.contributor_count,
+    contributor_names = ARRAY(SELECT donor_name FROM names),
+    updated_at = now()
+  FROM (
+    SELECT COALESCE(SUM(amount_paise), 0) AS raised_paise,
+           COUNT(DISTINCT session_id) AS paid_count,
+           COUNT(DISTINCT donor_name) AS contributor_count
+    FROM paid
+  ) agg
+  WHERE t.pot_id = p_pot_id;
+END;
+$$;
+
+-- Lock several pots' totals rows up front, always in pot_id order. Row-level triggers would
+-- otherwise lock them in allocation scan order, and two carts [A,B] and [B,A] paid at once deadlock.
+CREATE OR REPLACE FUNCTION lock_pot_totals(p_pot_ids UUID[])
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  INSERT INTO pot_totals (pot_id)
+  SELECT DISTINCT pot_id FROM unnest(p_pot_ids) AS pot_id ORDER BY pot_id
+  ON CONFLICT (pot_id) DO NOTHING;
+  PERFORM 1 FROM pot_totals WHERE pot_id = ANY(p_pot_ids) ORDER BY pot_id FOR UPDATE;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION allocations_refresh_pot_totals()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF TG_OP = 'UPDATE' AND OLD.status = NEW.status AND OLD.pot_id = NEW.pot_id
+     AND OLD.amount_paise = NEW.amount_paise THEN
+    RETURN NULL;
+  END IF;
+  IF TG_OP <> 'INSERT' AND OLD.status = 'paid' THEN
+    PERFORM refresh_pot_totals(OLD.pot_id);
+  END IF;
+  IF TG_OP <> 'DELETE' AND NEW.status = 'paid'
+     AND (TG_OP = 'INSERT' OR OLD.status <> 'paid' OR OLD.pot_id <> NEW.pot_id) THEN
+    PERFORM refresh_pot_totals(NEW.pot_id);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_allocations_pot_totals ON allocations;
+CREATE TRIGGER trg_allocations_pot_totals
+  AFTER INSERT OR DELETE OR UPDATE OF status, pot_id, amount_paise ON allocations
+  FOR EACH ROW EXECUTE FUNCTION allocations_refresh_pot_totals();
+
+-- A session becoming paid/failed carries its allocations with it; a paid donor's rename updates the names
+CREATE OR REPLACE FUNCTION sessions_sync_pot_totals()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF NEW.status IS DISTINCT FROM OLD.status AND NEW.status IN ('paid', 'failed') THEN
+    PERFORM lock_pot_totals(ARRAY(SELECT pot_id FROM allocations WHERE session_id = NEW.id));
+    UPDATE allocations SET status = NEW.status WHERE session_id = NEW.id AND status <> NEW.status;
+  ELSIF NEW.status = 'paid' AND NEW.donor_name IS DISTINCT FROM OLD.donor_name THEN
+    PERFORM lock_pot_totals(ARRAY(SELECT pot_id FROM allocations WHERE session_id = NEW.id));
+    PERFORM refresh_pot_totals(pot_id) FROM (SELECT DISTINCT pot_id FROM allocations WHERE session_id = NEW.id ORDER BY pot_id) p;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_sessions_pot_totals ON contribution_sessions;
+CREATE TRIGGER trg_sessions_pot_totals
+  AFTER UPDATE OF status, donor_name ON contribution_sessions
+  FOR EACH ROW EXECUTE FUNCTION sessions_sync_pot_totals();
+
+-- Backfill totals for existing data
+SELECT refresh_pot_totals(id) FROM pots;
+
+-- Create or update a session and replace its allocations in one transaction
+-- (POST /rest/v1/rpc/upsert_contribution_session). Validates the cart; errors surface as HTTP 400.
+CREATE OR REPLACE FUNCTION upsert_contribution_session(
+  p_allocations JSONB,
+  p_session_id UUID DEFAULT NULL,
+  p_donor JSONB DEFAULT '{}',
+  p_fee_rate NUMERIC DEFAULT 0,
+  p_payment_method TEXT DEFAULT 'razorpay'
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_session_id UUID := p_session_id;
+  v_total BIGINT;
+  v_fee BIGINT;
+BEGIN
+  IF p_allocations IS NULL OR jsonb_typeof(p_allocations) <> 'array' OR jsonb_array_length(p_allocations) = 0 THEN
+    RAISE EXCEPTION 'At least one allocation is required';
+  END IF;
+  IF EXISTS (SELECT 1 FROM jsonb_array_elements(p_allocations) a
+             WHERE COALESCE((a->>'amount_paise')::BIGINT, 0) <= 0) THEN
+    RAISE EXCEPTION 'Amounts must be positive';
+  END IF;
+  IF EXISTS (SELECT 1 FROM jsonb_array_elements(p_allocations) a
+             LEFT JOIN pots p ON p.id = (a->>'pot_id')::UUID
+             WHERE p.id IS NULL OR NOT p.is_active) THEN
+    RAISE EXCEPTION 'Unknown or inactive pot';
+  END IF;
+
+  SELECT SUM((a->>'amount_paise')::BIGINT) INTO v_total FROM jsonb_array_elements(p_allocations) a;
+  v_fee := FLOOR(v_total * p_fee_rate);
+
+  IF v_session_id IS NULL THEN
+    INSERT INTO contribution_sessions (donor_name, donor_email, donor_phone, donor_message,
+                                       total_amount_paise, fee_amount_paise, status, payment_method)
+    VALUES (COALESCE(p_donor->>'donor_name', ''), COALESCE(p_donor->>'donor_email', ''),
+            COALESCE(p_donor->>'donor_phone', ''), COALESCE(p_donor->>'donor_message', ''),
+            v_total, v_fee, 'created', p_payment_method)
+    RETURNING id INTO v_session_id;
+  ELSE
+    UPDATE contribution_sessions SET
+      donor_name = COALESCE(p_donor->>'donor_name', donor_name),
+      donor_email = COALESCE(p_donor->>'donor_email', donor_email),
+      donor_phone = COALESCE(p_donor->>'donor_phone', donor_phone),
+      donor_message = COALESCE(p_donor->>'donor_message', donor_message),
+      total_amount_paise = v_total,
+      fee_amount_paise = v_fee
+    WHERE id = v_session_id AND status = 'created';
+    IF NOT FOUND THEN
+      RAISE EXCEPTION 'Session cannot be updated';
+    END IF;
+    DELETE FROM allocations WHERE session_id = v_session_id;
+  END IF;
+
+  INSERT INTO allocations (session_id, pot_id, pot_item_id, amount_paise, status)
+  SELECT v_session_id, (a->>'pot_id')::UUID, NULLIF(a->>'pot_item_id', '')::UUID, (a->>'amount_paise')::BIGINT, 'pending'
+  FROM jsonb_array_elements(p_allocations) a;
+
+  RETURN jsonb_build_object('session_id', v_session_id, 'total_amount_paise', v_total, 'fee_amount_paise', v_fee);
+END;
+$$;
+
+-- Check-and-set a session's status in one statement (POST /rest/v1/rpc/transition_session)
+-- The session is found by id or Razorpay order id and locked; it only moves when its current status
+-- is in p_from_states (and, for gateway payments, the amount matches). Allocations follow via
+-- trg_sessions_pot_totals. Returns {found, transitioned, status, session, allocations, pot_totals}.
+CREATE OR REPLACE FUNCTION transition_session(
+  p_from_states TEXT[],
+  p_to_state TEXT,
+  p_session_id UUID DEFAULT NULL,
+  p_fields JSONB DEFAULT '{}',
+  p_order_id TEXT DEFAULT NULL,
+  p_expected_amount BIGINT DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_session contribution_sessions;
+  v_allocations JSONB;
+  v_pot_totals JSONB;
+BEGIN
+  IF p_session_id IS NOT NULL THEN
+    SELECT * INTO v_session FROM contribution_sessions WHERE id = p_session_id FOR UPDATE;
+  ELSE
+    SELECT * INTO v_session FROM contribution_sessions WHERE razorpay_order_id = p_order_id FOR UPDATE;
+  END IF;
+  IF NOT FOUND THEN
+    RETURN jsonb_build_object('found', false, 'transitioned', false);
+  END IF;
+
+  IF NOT (v_session.status = ANY(p_from_states)) THEN
+    RETURN jsonb_build_object('found', true, 'transitioned', false, 'status', v_session.status,
+                              'session', to_jsonb(v_session));
+  END IF;
+  IF p_expected_amount IS NOT NULL
+     AND p_expected_amount <> v_session.total_amount_paise + COALESCE(v_session.fee_amount_paise, 0) THEN
+    RETURN jsonb_build_object('found', true, 'transitioned', false, 'status', v_session.status,
+                              'amount_mismatch', true,
+                              'expected_amount', v_session.total_amount_paise + COALESCE(v_session.fee_amount_paise, 0));
+  END IF;
+
+  -- Take the pot totals locks in pot_id order before the triggers touch them
+  IF p_to_state IN ('paid', 'failed') OR v_session.status = 'paid' THEN
+    PERFORM lock_pot_totals(ARRAY(SELECT pot_id FROM allocations WHERE session_id = v_session.id));
+  END IF;
+
+  UPDATE contribution_sessions SET
+    status = p_to_state,
+    donor_name = COALESCE(p_fields->>'donor_name', donor_name),
+    donor_email = COALESCE(p_fields->>'donor_email', donor_email),
+    donor_phone = COALESCE(p_fields->>'donor_phone', donor_phone),
+    donor_message = COALESCE(p_fields->>'donor_message', donor_message),
+    utr = COALESCE(p_fields->>'utr', utr),
+    razorpay_order_id = COALESCE(p_fields->>'razorpay_order_id', razorpay_order_id),
+    razorpay_payment_id = COALESCE(p_fields->>'razorpay_payment_id', razorpay_payment_id),
+    submitted_at = COALESCE((p_fields->>'submitted_at')::TIMESTAMPTZ, submitted_at),
+    paid_at = CASE WHEN p_to_state = 'paid' THEN COALESCE(paid_at, now()) ELSE paid_at END
+  WHERE id = v_session.id
+  RETURNING * INTO v_session;
+
+  SELECT COALESCE(jsonb_agg(jsonb_build_object('pot_id', pot_id, 'amount_paise', amount_paise, 'status', status)), '[]')
+  INTO v_allocations
+  FROM allocations WHERE session_id = v_session.id;
+
+  SELECT COALESCE(jsonb_agg(to_jsonb(t)), '[]')
+  INTO v_pot_totals
+  FROM pot_totals t WHERE t.pot_id IN (SELECT pot_id FROM allocations WHERE session_id = v_session.id);
+
+  RETURN jsonb_build_object('found', true, 'transitioned', true, 'status', v_session.status,
+                            'session', to_jsonb(v_session), 'allocations', v_allocations,
+                            'pot_totals', v_pot_totals);
+END;
+$$;
+
+-- Thank You page progress in one query (POST /rest/v1/rpc/session_progress)
+-- The session's first pot, its goal, the session's share of it, the pot's paid total and the session status
+CREATE OR REPLACE FUNCTION session_progress(p_session_id UUID)
+RETURNS JSONB
+LANGUAGE sql STABLE
+AS $$
+  WITH first_pot AS (
+    SELECT pot_id FROM allocations WHERE session_id = p_session_id ORDER BY id LIMIT 1
+  )
+  SELECT jsonb_build_object(
+    'pot_id', p.id,
+    'pot_title', p.title,
+    'goal_amount_paise', COALESCE(p.goal_amount_paise, 0),
+    'session_status', s.status,
+    'session_contribution_paise', (SELECT SUM(a.amount_paise) FROM allocations a
+                                   WHERE a.session_id = p_session_id AND a.pot_id = p.id),
+    'raised_paise', COALESCE(t.raised_paise, 0)
+  )
+  FROM first_pot f
+  JOIN pots p ON p.id = f.pot_id
+  JOIN contribution_sessions s ON s.id = p_session_id
+  LEFT JOIN pot_totals t ON t.pot_id = p.id;
+$$;
+
+-- Pot listing with totals in one round trip (POST /rest/v1/rpc/pot_listing)
+-- Each active pot with its raised total, distinct contributor count and first 10 names (from pot_totals)
+CREATE OR REPLACE FUNCTION pot_listing()
+RETURNS TABLE (
+  id UUID,
+  title TEXT,
+  slug TEXT,
+  story_text TEXT,
+  cover_image_url TEXT,
+  goal_amount_paise BIGINT,
+  is_active BOOLEAN,
+  created_at TIMESTAMPTZ,
+  total_raised_paise BIGINT,
+  contributor_count BIGINT,
+  contributor_names TEXT[]
+)
+LANGUAGE sql STABLE
+AS $$
+  SELECT p.id, p.title, p.slug, p.story_text, p.cover_image_url, p.goal_amount_paise, p.is_active, p.created_at,
+         COALESCE(t.raised_paise, 0), COALESCE(t.contributor_count, 0)::BIGINT, COALESCE(t.contributor_names, '{}')
+  FROM pots p
+  LEFT JOIN pot_totals t ON t.pot_id = p.id
+  WHERE p.is_active
+  ORDER BY p.created_at DESC;
+$$;
+
+-- Bulk session lookup by id with the ids in the request body (POST /rest/v1/rpc/sessions_by_ids)
+-- Avoids multi-kilobyte `id=in.(...)` URLs; select/order/filters still apply via the query string
+CREATE OR REPLACE FUNCTION sessions_by_ids(ids UUID[])
+RETURNS SETOF contribution_sessions
+LANGUAGE sql STABLE
+AS $$
+  SELECT * FROM contribution_sessions WHERE id = ANY(ids);
+$$;
 
 -- Disable RLS for simplicity (service key bypasses anyway)
 ALTER TABLE pots ENABLE ROW LEVEL SECURITY;
@@ -96,6 +427,7 @@ ALTER TABLE pot_items ENABLE ROW LEVEL SECURITY;
 ALTER TABLE contribution_sessions ENABLE ROW LEVEL SECURITY;
 ALTER TABLE allocations ENABLE ROW LEVEL SECURITY;
 ALTER TABLE webhook_events ENABLE ROW LEVEL SECURITY;
+ALTER TABLE pot_totals ENABLE ROW LEVEL SECURITY;
 
 -- Allow service role full access
 CREATE POLICY "service_role_all_pots" ON pots FOR ALL USING (true) WITH CHECK (true);
@@ -103,6 +435,7 @@ CREATE POLICY "service_role_all_pot_items" ON pot_items FOR ALL USING (true) WIT
 CREATE POLICY "service_role_all_sessions" ON contribution_sessions FOR ALL USING (true) WITH CHECK (true);
 CREATE POLICY "service_role_all_allocations" ON allocations FOR ALL USING (true) WITH CHECK (true);
 CREATE POLICY "service_role_all_webhook" ON webhook_events FOR ALL USING (true) WITH CHECK (true);
+CREATE POLICY "service_role_all_pot_totals" ON pot_totals FOR ALL USING (true) WITH CHECK (true);
 
 -- Site settings policy
 ALTER TABLE site_settings ENABLE ROW LEVEL SECURITY;
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, APIRouter, Request, HTTPException, Depends, Header, Query
+from fastapi import FastAPI, APIRouter, Request, Response, HTTPException, Depends, Header, Query, WebSocket
 from fastapi.responses import StreamingResponse, RedirectResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
@@ -10,15 +10,33 @@ import hashlib
 import html
 import csv
 import io
+import base64
+import zlib
 import time
 import logging
-from datetime import datetime, timezone
+import asyncio
+import sqlite3
+import functools
+import random
+import threading
+from datetime import date, datetime, timedelta, timezone
+from itertools import islice
 from pathlib import Path
-from collections import defaultdict
+from collections import defaultdict, Counter, deque, OrderedDict
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
 import httpx
 import razorpay
+import requests
+from requests.adapters import HTTPAdapter
 from jose import jwt as jose_jwt
 
+try:  # optional: only the Parquet/Arrow export needs it
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
@@ -30,9 +48,13 @@ RAZORPAY_KEY_SECRET = os.environ.get('RAZORPAY_KEY_SECRET', '')
 RAZORPAY_WEBHOOK_SECRET = os.environ.get('RAZORPAY_WEBHOOK_SECRET', '')
 ADMIN_USERNAME = os.environ.get('ADMIN_USERNAME', '')
 ADMIN_PASSWORD = os.environ.get('ADMIN_PASSWORD', '')
+# Admin date filters without an explicit offset are read in this zone (IST by default)
+ADMIN_TIMEZONE = timezone(timedelta(minutes=int(os.environ.get('ADMIN_UTC_OFFSET_MINUTES', '330'))))
 JWT_SECRET = os.environ.get('JWT_SECRET', 'default-secret')
 PAYMENT_PROVIDER = os.environ.get('PAYMENT_PROVIDER', 'razorpay')
+RAZORPAY_FEE_RATE = 0.0236
 DEFAULT_UPI_ID = os.environ.get('DEFAULT_UPI_ID', '8618052253@ybl')
+DEFAULT_UPI_NAME = "Shvetha & Aadi Wedding Gift"
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -45,60 +67,1174 @@ SB_HEADERS = {
     "Content-Type": "application/json",
     "Prefer": "return=representation"
 }
+SB_READ_HEADERS = {k: v for k, v in SB_HEADERS.items() if k != "Prefer"}
+
+# Connection pool sizing — tune for the crowd scanning the QR code at the venue
+SB_POOL_MAX_CONNECTIONS = int(os.environ.get('SB_POOL_MAX_CONNECTIONS', '50'))
+SB_POOL_MAX_KEEPALIVE = int(os.environ.get('SB_POOL_MAX_KEEPALIVE', '20'))
+SB_POOL_KEEPALIVE_EXPIRY = float(os.environ.get('SB_POOL_KEEPALIVE_EXPIRY', '30'))
+SB_HTTP2 = os.environ.get('SB_HTTP2', 'true').lower() == 'true'
+SB_TIMEOUT = float(os.environ.get('SB_TIMEOUT', '30'))
+
+# App-scoped client, opened and closed by the lifespan hook
+_sb_client = None
+
+
+def _new_sb_client():
+    return httpx.AsyncClient(
+        base_url=SB_BASE,
+        headers=SB_READ_HEADERS,
+        timeout=SB_TIMEOUT,
+        http2=SB_HTTP2,
+        limits=httpx.Limits(
+            max_connections=SB_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=SB_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=SB_POOL_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+def get_sb_client():
+    """Return the shared Supabase client (created lazily outside the app lifespan, e.g. scripts)."""
+    global _sb_client
+    if _sb_client is None or _sb_client.is_closed:
+        _sb_client = _new_sb_client()
+    return _sb_client
+
+
+async def close_sb_client():
+    global _sb_client
+    if _sb_client is not None:
+        await _sb_client.aclose()
+        _sb_client = None
+
+
+def sb_pool_stats():
+    """Open / idle / in-use connections and queued requests of the shared pool."""
+    stats = {"open": 0, "idle": 0, "active": 0, "waiting": 0,
+             "max_connections": SB_POOL_MAX_CONNECTIONS, "max_keepalive": SB_POOL_MAX_KEEPALIVE, "http2": SB_HTTP2}
+    if _sb_client is None:
+        return stats
+    # httpcore doesn't expose these publicly; read them defensively
+    pool = getattr(_sb_client._transport, "_pool", None)
+    if pool is None:
+        return stats
+    for conn in getattr(pool, "connections", []):
+        stats["open"] += 1
+        if conn.is_idle():
+            stats["idle"] += 1
+        else:
+            stats["active"] += 1
+    stats["waiting"] = sum(1 for req in getattr(pool, "_requests", []) if req.is_queued())
+    return stats
+
+
+# Read-through cache for sb_get, keyed by table + params
+SB_CACHE_MAX_ENTRIES = int(os.environ.get('SB_CACHE_MAX_ENTRIES', '1024'))
+SB_CACHE_TTL_SECONDS = float(os.environ.get('SB_CACHE_TTL_SECONDS', '30'))
+# Tables cached by default; a call can set its own cache_ttl (0 opts out)
+SB_CACHE_TABLE_TTLS = {"pots": SB_CACHE_TTL_SECONDS, "pot_items": SB_CACHE_TTL_SECONDS}
+# Tables each RPC writes to, so its calls invalidate them like sb_post/sb_patch do
+SB_RPC_WRITES = {
+    "transition_session": ("contribution_sessions", "allocations", "pot_totals"),
+    "upsert_contribution_session": ("contribution_sessions", "allocations"),
+}
 
 
-async def sb_get(table, params=None):
-    async with httpx.AsyncClient(timeout=30) as c:
-        r = await c.get(f"{SB_BASE}/{table}", params=params or {}, headers={k: v for k, v in SB_HEADERS.items() if k != "Prefer"})
-        if r.status_code >= 400:
-            logger.error(f"SB GET {table}: {r.status_code} {r.text}")
-            if "schema cache" in r.text:
-                raise HTTPException(503, detail="Database tables not set up. Run schema.sql in Supabase Dashboard.")
-            raise HTTPException(502, detail=f"Database error")
-        return r.json()
+class QueryCache:
+    """LRU of sb_get results with per-entry expiry and per-table invalidation.
+
+    Writes bump their table's generation once they complete, so a read that
+    overlapped a write never stores its (possibly stale) result.
+    """
+
+    def __init__(self, max_entries=SB_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # (table, params) -> (expires_at, rows)
+        self.by_table = defaultdict(set)
+        self.generations = Counter()
+        self.hits = Counter()
+        self.misses = Counter()
+
+    @staticmethod
+    def key(table, params):
+        return table, tuple(sorted((k, str(v)) for k, v in params.items()))
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self.misses[key[0]] += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits[key[0]] += 1
+        # Rows are shallow-copied because handlers decorate them in place
+        return [dict(row) for row in entry[1]]
+
+    def put(self, key, rows, ttl, generation):
+        table = key[0]
+        if generation != self.generations[table]:
+            return
+        self.entries[key] = (time.monotonic() + ttl, [dict(row) for row in rows])
+        self.entries.move_to_end(key)
+        self.by_table[table].add(key)
+        while len(self.entries) > self.max_entries:
+            old, _ = self.entries.popitem(last=False)
+            self.by_table[old[0]].discard(old)
+
+    def invalidate(self, table):
+        self.generations[table] += 1
+        for key in self.by_table.pop(table, ()):
+            self.entries.pop(key, None)
+
+    def stats(self):
+        tables = set(self.hits) | set(self.misses)
+        return {
+            "entries": len(self.entries),
+            "tables": {t: {"hits": self.hits[t], "misses": self.misses[t], "entries": len(self.by_table.get(t, ()))}
+                       for t in sorted(tables)}
+        }
+
+
+sb_cache = QueryCache()
+
+
+async def sb_get(table, params=None, cache_ttl=None):
+    """GET rows from a table, served from sb_cache when the table (or cache_ttl) allows it."""
+    params = params or {}
+    ttl = SB_CACHE_TABLE_TTLS.get(table, 0) if cache_ttl is None else cache_ttl
+    if ttl > 0:
+        key = QueryCache.key(table, params)
+        rows = sb_cache.get(key)
+        if rows is not None:
+            return rows
+        generation = sb_cache.generations[table]
+    r = await get_sb_client().get(f"/{table}", params=params)
+    if r.status_code >= 400:
+        logger.error(f"SB GET {table}: {r.status_code} {r.text}")
+        if "schema cache" in r.text:
+            raise HTTPException(503, detail="Database tables not set up. Run schema.sql in Supabase Dashboard.")
+        raise HTTPException(502, detail=f"Database error")
+    rows = r.json()
+    if ttl > 0:
+        sb_cache.put(key, rows, ttl, generation)
+    return rows
+
+
+async def sb_count(table, params=None):
+    """Exact row count for a filtered table, read from Content-Range without transferring rows."""
+    r = await get_sb_client().head(f"/{table}", params=params or {}, headers={"Prefer": "count=exact"})
+    if r.status_code >= 400:
+        logger.error(f"SB COUNT {table}: {r.status_code}")
+        raise HTTPException(502, detail="Database error")
+    return int(r.headers.get("content-range", "*/0").rsplit("/", 1)[1])
 
 
 async def sb_post(table, data):
-    async with httpx.AsyncClient(timeout=30) as c:
-        r = await c.post(f"{SB_BASE}/{table}", json=data, headers=SB_HEADERS)
-        if r.status_code >= 400:
-            logger.error(f"SB POST {table}: {r.status_code} {r.text}")
-            raise HTTPException(502, detail=f"Database error: {r.text}")
-        return r.json()
+    r = await get_sb_client().post(f"/{table}", json=data, headers=SB_HEADERS)
+    sb_cache.invalidate(table)
+    if r.status_code >= 400:
+        logger.error(f"SB POST {table}: {r.status_code} {r.text}")
+        raise HTTPException(502, detail=f"Database error: {r.text}")
+    return r.json()
 
 
 async def sb_patch(table, data, filters):
-    async with httpx.AsyncClient(timeout=30) as c:
-        r = await c.patch(f"{SB_BASE}/{table}", params=filters, json=data, headers=SB_HEADERS)
-        if r.status_code >= 400:
-            logger.error(f"SB PATCH {table}: {r.status_code} {r.text}")
-            raise HTTPException(502, detail=f"Database error")
-        return r.json()
+    r = await get_sb_client().patch(f"/{table}", params=filters, json=data, headers=SB_HEADERS)
+    sb_cache.invalidate(table)
+    if r.status_code >= 400:
+        logger.error(f"SB PATCH {table}: {r.status_code} {r.text}")
+        raise HTTPException(502, detail=f"Database error")
+    return r.json()
+
+
+async def sb_upsert(table, rows, on_conflict, ignore_duplicates=False):
+    """Insert many rows in one request; rows clashing on on_conflict are merged (or skipped)."""
+    resolution = "ignore-duplicates" if ignore_duplicates else "merge-duplicates"
+    headers = {**SB_HEADERS, "Prefer": f"return=representation,resolution={resolution}"}
+    r = await get_sb_client().post(f"/{table}", params={"on_conflict": on_conflict}, json=rows, headers=headers)
+    sb_cache.invalidate(table)
+    if r.status_code >= 400:
+        logger.error(f"SB UPSERT {table}: {r.status_code} {r.text}")
+        raise HTTPException(502, detail=f"Database error")
+    return r.json()
+
+
+async def sb_rpc(fn, args=None, params=None):
+    """Call a Postgres function exposed by PostgREST (POST /rpc/<fn>, arguments in the body).
+
+    params (select/order/filters) apply to functions returning table rows.
+    """
+    r = await get_sb_client().post(f"/rpc/{fn}", params=params or {}, json=args or {}, headers=SB_HEADERS)
+    for table in SB_RPC_WRITES.get(fn, ()):
+        sb_cache.invalidate(table)
+    if r.status_code >= 400:
+        logger.error(f"SB RPC {fn}: {r.status_code} {r.text}")
+        if r.status_code == 400 and r.headers.get("content-type", "").startswith("application/json"):
+            err = r.json()
+            # RAISE EXCEPTION in our functions (P0001) carries a user-facing message
+            if err.get("code") == "P0001":
+                raise HTTPException(400, detail=err.get("message", "Invalid request"))
+            if err.get("code", "").startswith("22"):
+                raise HTTPException(400, detail="Invalid input")
+        if "schema cache" in r.text:
+            raise HTTPException(503, detail="Database functions not set up. Run schema.sql in Supabase Dashboard.")
+        raise HTTPException(502, detail=f"Database error")
+    return r.json()
+
+
+# Bulk `in.(...)` lookups: bounded chunks so URLs stay well under proxy/PostgREST limits
+SB_IN_CHUNK_SIZE = int(os.environ.get('SB_IN_CHUNK_SIZE', '100'))
+SB_IN_CONCURRENCY = int(os.environ.get('SB_IN_CONCURRENCY', '8'))
+# Tables with a POST-bodied id lookup function in schema.sql (ids travel in the body, not the URL)
+SB_ID_LOOKUP_RPCS = {"contribution_sessions": "sessions_by_ids"}
+
+
+async def sb_get_in(table, column, values, params=None, cache_ttl=None):
+    """sb_get with a `column=in.(values)` filter that stays bounded however many values there are.
+
+    Large id sets go through the table's lookup RPC when it has one; otherwise
+    they are split into chunks fetched concurrently and merged in chunk order
+    (callers needing a global order across chunks should sort the result).
+    """
+    values = list(dict.fromkeys(values))
+    if not values:
+        return []
+    params = params or {}
+    rpc = SB_ID_LOOKUP_RPCS.get(table) if column == "id" else None
+    if rpc and len(values) > SB_IN_CHUNK_SIZE:
+        try:
+            return await sb_rpc(rpc, {"ids": values}, params)
+        except HTTPException as e:
+            if e.status_code != 503:
+                raise
+            logger.warning(f"{rpc} not deployed, falling back to chunked lookups")
 
+    sem = asyncio.Semaphore(SB_IN_CONCURRENCY)
 
-async def sb_delete(table, filters):
-    hdrs = {**SB_HEADERS}
-    async with httpx.AsyncClient(timeout=30) as c:
-        r = await c.delete(f"{SB_BASE}/{table}", params=filters, headers=hdrs)
-        if r.status_code >= 400:
-            logger.error(f"SB DELETE {table}: {r.status_code} {r.text}")
-            raise HTTPException(502, detail=f"Database error")
-        return r.json() if r.text else []
+    async def fetch(chunk):
+        async with sem:
+            return await sb_get(table, {**params, column: f"in.({','.join(chunk)})"}, cache_ttl)
 
+    chunks = [values[i:i + SB_IN_CHUNK_SIZE] for i in range(0, len(values), SB_IN_CHUNK_SIZE)]
+    results = await asyncio.gather(*(fetch(c) for c in chunks))
+    return [row for part in results for row in part]
 
-# Razorpay
-razorpay_client = razorpay.Client(auth=(RAZORPAY_KEY_ID, RAZORPAY_KEY_SECRET))
 
-# Rate limiter
-_rate_store = defaultdict(list)
+async def sb_delete(table, filters):
+    r = await get_sb_client().delete(f"/{table}", params=filters, headers=SB_HEADERS)
+    sb_cache.invalidate(table)
+    if r.status_code >= 400:
+        logger.error(f"SB DELETE {table}: {r.status_code} {r.text}")
+        raise HTTPException(502, detail=f"Database error")
+    return r.json() if r.text else []
+
+
+# Independent reads inside one handler run together instead of back to back
+SB_FANOUT_CONCURRENCY = int(os.environ.get('SB_FANOUT_CONCURRENCY', '4'))
+
+
+async def sb_gather(reads, limit=SB_FANOUT_CONCURRENCY):
+    """Await named, independent reads concurrently with at most `limit` in flight.
+
+    Returns (results, errors). A failed read is None in results and its error
+    detail is in errors, so handlers can serve partial data; raises 502 only
+    when every read failed.
+    """
+    sem = asyncio.Semaphore(limit)
+
+    async def run(read):
+        async with sem:
+            return await read
+
+    names = list(reads)
+    outcomes = await asyncio.gather(*(run(reads[n]) for n in names), return_exceptions=True)
+    results, errors = {}, {}
+    for name, outcome in zip(names, outcomes):
+        if isinstance(outcome, BaseException):
+            if not isinstance(outcome, Exception):
+                raise outcome
+            logger.warning(f"Read '{name}' failed: {outcome!r}")
+            results[name] = None
+            errors[name] = outcome.detail if isinstance(outcome, HTTPException) else "Database error"
+        else:
+            results[name] = outcome
+    if names and len(errors) == len(names):
+        raise HTTPException(502, detail="Database error")
+    return results, errors
+
+
+# Razorpay: the SDK is synchronous, so gateway calls run on a dedicated bounded pool
+RAZORPAY_POOL_SIZE = int(os.environ.get('RAZORPAY_POOL_SIZE', '8'))
+RAZORPAY_TIMEOUT = float(os.environ.get('RAZORPAY_TIMEOUT', '15'))
+
+
+def _new_razorpay_client():
+    # Keep-alive connections sized to the pool so concurrent checkouts reuse TLS sessions
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=RAZORPAY_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return razorpay.Client(session=session, auth=(RAZORPAY_KEY_ID, RAZORPAY_KEY_SECRET))
+
+
+razorpay_client = _new_razorpay_client()
+_razorpay_executor = ThreadPoolExecutor(max_workers=RAZORPAY_POOL_SIZE, thread_name_prefix="razorpay")
+_razorpay_in_flight = 0
+
+
+async def razorpay_call(fn, *args):
+    """Run a blocking Razorpay SDK call off the event loop, bounded by RAZORPAY_TIMEOUT.
+
+    Raises asyncio.TimeoutError if the gateway doesn't answer in time (the
+    worker thread is released once requests' own socket timeout fires).
+    """
+    global _razorpay_in_flight
+    loop = asyncio.get_running_loop()
+    call = functools.partial(fn, *args, timeout=RAZORPAY_TIMEOUT)
+    _razorpay_in_flight += 1
+    try:
+        return await asyncio.wait_for(loop.run_in_executor(_razorpay_executor, call), RAZORPAY_TIMEOUT)
+    finally:
+        _razorpay_in_flight -= 1
+
+# Rate limiter: token buckets (max_req tokens, refilled evenly over window seconds)
+RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')  # memory | sqlite
+RATE_LIMIT_MAX_KEYS = int(os.environ.get('RATE_LIMIT_MAX_KEYS', '100000'))
+RATE_LIMIT_SQLITE_PATH = os.environ.get('RATE_LIMIT_SQLITE_PATH', '/tmp/wedding_rate_limit.sqlite3')
+RATE_LIMIT_SWEEP_SECONDS = 60
+# Longest a request waits on another worker's bucket write before it is let through
+RATE_LIMIT_BUSY_TIMEOUT_MS = int(os.environ.get('RATE_LIMIT_BUSY_TIMEOUT_MS', '20'))
+
+
+def _take_token(tokens, updated, now, max_req, window):
+    """Refill a bucket up to now and try to spend one token. Returns (allowed, tokens)."""
+    tokens = min(max_req, tokens + (now - updated) * max_req / window)
+    if tokens < 1:
+        return False, tokens
+    return True, tokens - 1
+
+
+class MemoryRateStore:
+    """Per-process buckets: (tokens, updated, idle_after) per key, one LRU per window.
+
+    A bucket is full again (so indistinguishable from a new one) once it has
+    been idle for its whole window. Buckets with the same window go idle in
+    the order they were last used, so each window's LRU is swept from its cold
+    end; over max_keys, the bucket closest to going idle is dropped first.
+    """
+
+    def __init__(self, max_keys=RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self.windows = {}  # window -> OrderedDict of key -> bucket
+        self.size = 0
+
+    def take(self, key, max_req, window, now):
+        buckets = self.windows.get(window)
+        if buckets is None:
+            buckets = self.windows[window] = OrderedDict()
+        bucket = buckets.pop(key, None)
+        if bucket is None:
+            bucket = (max_req, now, 0)
+            self.size += 1
+        allowed, tokens = _take_token(bucket[0], bucket[1], now, max_req, window)
+        buckets[key] = (tokens, now, now + window)
+        self._sweep(now)
+        return allowed
+
+    def _sweep(self, now):
+        windows = self.windows
+        for buckets in windows.values():
+            while buckets and next(iter(buckets.values()))[2] <= now:
+                buckets.popitem(last=False)
+                self.size -= 1
+        while self.size > self.max_keys:
+            if len(windows) == 1:
+                buckets = next(iter(windows.values()))
+            else:
+                buckets = min((b for b in windows.values() if b), key=lambda b: next(iter(b.values()))[2])
+            buckets.popitem(last=False)
+            self.size -= 1
+
+    def __len__(self):
+        return self.size
+
+
+class SqliteRateStore:
+    """Buckets in a WAL-mode SQLite file so every uvicorn worker on the host shares limits.
+
+    take() runs on the event loop, so it only waits busy_timeout_ms for the
+    write lock; if another worker holds it longer the request is allowed
+    (fail open) rather than stalling every other request on this worker.
+    """
+
+    def __init__(self, path=RATE_LIMIT_SQLITE_PATH, busy_timeout_ms=RATE_LIMIT_BUSY_TIMEOUT_MS):
+        self.db = sqlite3.connect(path, timeout=busy_timeout_ms / 1000, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets "
+            "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, idle_after REAL NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_rate_buckets_idle ON rate_buckets(idle_after)")
+        self.next_sweep = 0
+        self.busy = 0
+
+    def take(self, key, max_req, window, now):
+        try:
+            return self._take(key, max_req, window, now)
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) and "busy" not in str(e):
+                raise
+            self.busy += 1
+            return True
+
+    def _take(self, key, max_req, window, now):
+        db = self.db
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT tokens, updated FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+            allowed, tokens = _take_token(*(row or (max_req, now)), now, max_req, window)
+            db.execute(
+                "INSERT INTO rate_buckets (key, tokens, updated, idle_after) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated, "
+                "idle_after = excluded.idle_after",
+                (key, tokens, now, now + window)
+            )
+            if now >= self.next_sweep:
+                db.execute("DELETE FROM rate_buckets WHERE idle_after < ?", (now,))
+                self.next_sweep = now + RATE_LIMIT_SWEEP_SECONDS
+            db.execute("COMMIT")
+        except Exception:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+        return allowed
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM rate_buckets").fetchone()[0]
+
+
+def _new_rate_store(backend=RATE_LIMIT_BACKEND):
+    if backend == "sqlite":
+        return SqliteRateStore()
+    if backend != "memory":
+        logger.warning(f"Unknown RATE_LIMIT_BACKEND '{backend}', using memory")
+    return MemoryRateStore()
+
+
+_rate_store = _new_rate_store()
 
 
 def rate_limit(key, max_req=10, window=60):
-    now = time.time()
-    _rate_store[key] = [t for t in _rate_store[key] if now - t < window]
-    if len(_rate_store[key]) >= max_req:
+    # Each (max_req, window) limit gets its own bucket for the key
+    if not _rate_store.take(f"{key}:{max_req}:{window}", max_req, window, time.time()):
         raise HTTPException(429, "Rate limit exceeded. Try again later.")
-    _rate_store[key].append(now)
+
+
+# Pot totals cache
+POT_TOTALS_RECONCILE_SECONDS = int(os.environ.get('POT_TOTALS_RECONCILE_SECONDS', '300'))
+
+
+class PotTotals:
+    """In-process mirror of the pot_totals table (kept current by database triggers).
+
+    Loaded once at startup, refreshed for the affected pots whenever a payment
+    path flips a session to paid/failed, and fully reloaded periodically so
+    changes made by other workers (or directly in the database) are picked up.
+    Read endpoints never touch allocations.
+    """
+
+    FIELDS = "pot_id,raised_paise,paid_count,contributor_count,contributor_names"
+
+    def __init__(self):
+        self.rows = {}  # pot_id -> pot_totals row
+        self.ready = False
+        self.built_at = None
+        self._lock = asyncio.Lock()
+        self._warming = None
+
+    def total(self, pot_id):
+        return self.rows.get(pot_id, {}).get("raised_paise", 0)
+
+    def paid_count(self, pot_id):
+        return self.rows.get(pot_id, {}).get("paid_count", 0)
+
+    def contributor_count(self, pot_id):
+        return self.rows.get(pot_id, {}).get("contributor_count", 0)
+
+    def contributor_names(self, pot_id, limit=10):
+        return self.rows.get(pot_id, {}).get("contributor_names", [])[:limit]
+
+    async def rebuild(self, force=True):
+        async with self._lock:
+            if not force and self.ready:
+                return
+            rows = await sb_get("pot_totals", {"select": self.FIELDS})
+            self.rows = {r["pot_id"]: r for r in rows}
+            self.ready = True
+            self.built_at = time.time()
+
+    async def refresh(self, pot_ids, rows=None):
+        """Update the given pots after a payment changed them (re-read unless fresh rows are supplied)."""
+        async with self._lock:
+            if rows is None:
+                rows = await sb_get_in("pot_totals", "pot_id", pot_ids, {"select": self.FIELDS})
+            for r in rows:
+                self.rows[r["pot_id"]] = r
+
+    async def ensure_ready(self):
+        if not self.ready:
+            await self.rebuild(force=False)
+
+    async def read(self, pot_ids=None):
+        """Current rows straight from the table, for reads that can't wait for the next reconcile.
+
+        The mirror here is only rebuilt every POT_TOTALS_RECONCILE_SECONDS for
+        payments another worker recorded; the rows read also freshen it.
+        """
+        params = {"select": self.FIELDS}
+        if pot_ids is None:
+            rows = await sb_get("pot_totals", params)
+        else:
+            rows = await sb_get_in("pot_totals", "pot_id", pot_ids, params)
+        for r in rows:
+            self.rows[r["pot_id"]] = r
+        return {r["pot_id"]: r for r in rows}
+
+    def warm(self):
+        """Start building in the background without making the caller wait."""
+        if self._warming is None or self._warming.done():
+            self._warming = asyncio.create_task(self._warm())
+
+    async def _warm(self):
+        try:
+            await self.ensure_ready()
+        except Exception as e:
+            logger.warning(f"Pot totals build failed: {e}")
+
+    def stats(self):
+        return {"ready": self.ready, "built_at": self.built_at, "pots": len(self.rows)}
+
+
+pot_totals = PotTotals()
+
+
+async def _reconcile_pot_totals():
+    while True:
+        await asyncio.sleep(POT_TOTALS_RECONCILE_SECONDS)
+        try:
+            await pot_totals.rebuild()
+        except Exception as e:
+            logger.warning(f"Pot totals reconcile failed: {e}")
+
+
+# Live pot progress (Server-Sent Events)
+POT_STREAM_HEARTBEAT_SECONDS = int(os.environ.get('POT_STREAM_HEARTBEAT_SECONDS', '15'))
+POT_STREAM_HISTORY = int(os.environ.get('POT_STREAM_HISTORY', '512'))
+
+
+class PotEventHub:
+    """Fan-out of pot progress deltas to SSE subscribers.
+
+    Subscribers share one wake-up event and read from a bounded history, so an
+    idle guest connection costs one waiting coroutine and no per-client queue.
+    The history also serves Last-Event-ID resumes.
+    """
+
+    def __init__(self, history=POT_STREAM_HISTORY):
+        self.history = deque(maxlen=history)  # (event id, encoded data)
+        self.last_id = 0
+        self.subscribers = 0
+        self._wakeup = asyncio.Event()
+
+    def publish(self, data):
+        self.last_id += 1
+        self.history.append((self.last_id, json.dumps(data, separators=(",", ":"))))
+        self._wakeup.set()
+        self._wakeup = asyncio.Event()
+
+    def since(self, last_id):
+        """Events after last_id, or None when they can't be replayed (too old or from another process)."""
+        if last_id > self.last_id:
+            return None
+        if last_id == self.last_id:
+            return []
+        oldest = self.history[0][0]
+        if last_id < oldest - 1:
+            return None
+        return list(islice(self.history, last_id - oldest + 1, None))
+
+    async def wait(self, timeout):
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+pot_events = PotEventHub()
+
+
+def _pot_progress(pot_ids):
+    return {pid: {
+        "total_raised_paise": pot_totals.total(pid),
+        "contributor_count": pot_totals.contributor_count(pid)
+    } for pid in pot_ids}
+
+
+# Live venue display: WebSocket broadcast of pot progress and new blessings
+LIVE_CLIENT_BUFFER = int(os.environ.get('LIVE_CLIENT_BUFFER', '64'))
+LIVE_MAX_CLIENTS = int(os.environ.get('LIVE_MAX_CLIENTS', '5000'))
+LIVE_SNAPSHOT_BLESSINGS = 20
+LIVE_SNAPSHOT_TTL_SECONDS = 1  # reconnect storms share one encoded snapshot
+
+
+class LiveHub:
+    """Fan-out of live messages to /api/live WebSocket clients.
+
+    Each message is encoded once and the same string is queued for every
+    client. A client whose bounded queue is full has fallen LIVE_CLIENT_BUFFER
+    messages behind: its queue is emptied and it is disconnected, so a stalled
+    phone never holds up the others or grows the worker's memory.
+    """
+
+    def __init__(self, buffer=LIVE_CLIENT_BUFFER):
+        self.buffer = buffer
+        self.clients = set()
+        self.published = 0
+        self.dropped = 0
+        self._snapshot = None  # (encoded, built_at)
+
+    def subscribe(self):
+        queue = asyncio.Queue(self.buffer)
+        self.clients.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.clients.discard(queue)
+
+    def publish(self, kind, data):
+        message = json.dumps({"type": kind, "data": data}, ensure_ascii=False, separators=(",", ":"))
+        self.published += 1
+        self._snapshot = None
+        for queue in list(self.clients):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._drop(queue)
+
+    def _drop(self, queue):
+        self.clients.discard(queue)
+        self.dropped += 1
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)  # tells the client's sender to close
+
+    def snapshot(self):
+        if self._snapshot is None or time.monotonic() - self._snapshot[1] > LIVE_SNAPSHOT_TTL_SECONDS:
+            encoded = json.dumps({"type": "snapshot", "data": {
+                "pots": _pot_progress(list(pot_totals.rows)),
+                "blessings": list(islice(blessings_ring.items, LIVE_SNAPSHOT_BLESSINGS))
+            }}, ensure_ascii=False, separators=(",", ":"))
+            self._snapshot = (encoded, time.monotonic())
+        return self._snapshot[0]
+
+    def stats(self):
+        return {"clients": len(self.clients), "published": self.published, "dropped": self.dropped,
+                "buffer": self.buffer}
+
+
+live_hub = LiveHub()
+
+
+# Long-poll session status
+SESSION_STATUS_FIELDS = "id,status,total_amount_paise,fee_amount_paise,razorpay_order_id,razorpay_payment_id,paid_at"
+
+
+SESSION_WAIT_RECHECK_SECONDS = float(os.environ.get('SESSION_WAIT_RECHECK_SECONDS', '2'))
+
+
+class SessionWaiters:
+    """Registry of long-poll requests waiting for a session's status to change.
+
+    signal() only reaches waiters in this process, so a waiter also re-reads
+    the session every SESSION_WAIT_RECHECK_SECONDS to see payments another
+    worker recorded.
+    """
+
+    def __init__(self):
+        self._waiting = {}  # session_id -> [future, waiter count]
+
+    async def wait(self, session_id, timeout, check):
+        """Return the signalled session, or the first row check() returns; None after timeout.
+
+        The waiter is registered before the first check, so a signal that
+        lands while the session is being read is not lost.
+        """
+        entry = self._waiting.get(session_id)
+        if entry is None:
+            entry = self._waiting[session_id] = [asyncio.get_running_loop().create_future(), 0]
+        entry[1] += 1
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                session = await check()
+                if session is not None:
+                    return session
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                try:
+                    return await asyncio.wait_for(asyncio.shield(entry[0]), min(remaining, SESSION_WAIT_RECHECK_SECONDS))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and self._waiting.get(session_id) is entry:
+                del self._waiting[session_id]
+
+    def signal(self, session_id, session):
+        entry = self._waiting.pop(session_id, None)
+        if entry and not entry[0].done():
+            entry[0].set_result(session)
+
+    def __len__(self):
+        return len(self._waiting)
+
+
+session_waiters = SessionWaiters()
+
+
+# Thank You page progress never changes once a session is paid
+SESSION_PROGRESS_CACHE_SIZE = int(os.environ.get('SESSION_PROGRESS_CACHE_SIZE', '2048'))
+_progress_cache = OrderedDict()  # session_id -> progress response
+
+# Webhook replays: Razorpay retries deliveries and sends payment.captured and order.paid per payment
+WEBHOOK_REPLAY_CACHE_SIZE = int(os.environ.get('WEBHOOK_REPLAY_CACHE_SIZE', '20000'))
+
+
+class RecentKeys:
+    """Bounded set that forgets its least recently added keys first."""
+
+    def __init__(self, max_size=WEBHOOK_REPLAY_CACHE_SIZE):
+        self.max_size = max_size
+        self.keys = OrderedDict()
+
+    def add(self, key):
+        self.keys[key] = None
+        self.keys.move_to_end(key)
+        if len(self.keys) > self.max_size:
+            self.keys.popitem(last=False)
+
+    def discard(self, key):
+        self.keys.pop(key, None)
+
+    def __contains__(self, key):
+        return key in self.keys
+
+    def __len__(self):
+        return len(self.keys)
+
+
+_seen_webhook_events = RecentKeys()  # gateway event ids already queued
+_settled_orders = RecentKeys()       # Razorpay order ids whose session is paid
+_webhook_replays = 0
+
+
+async def _record_status_change(session_id, status, allocs=(), session=None, totals=None):
+    """Single hook for every code path that flips a session to paid/failed."""
+    session_waiters.signal(session_id, session or {"id": session_id, "status": status})
+    _progress_cache.pop(session_id, None)
+    if status == "paid" and session:
+        blessing = blessings_ring.push(session)
+        if blessing:
+            live_hub.publish("blessing", blessing)
+    elif blessings_ring.discard(session_id):
+        live_hub.publish("blessing_removed", {"id": session_id})
+    public_cache.expire()
+    order_id = (session or {}).get("razorpay_order_id")
+    if order_id:
+        if status == "paid":
+            _settled_orders.add(order_id)
+        else:
+            _settled_orders.discard(order_id)
+    pot_ids = list(dict.fromkeys(a["pot_id"] for a in allocs))
+    if not pot_ids:
+        return
+    try:
+        await pot_totals.refresh(pot_ids, totals)
+    except Exception as e:
+        logger.warning(f"Pot totals refresh failed for {pot_ids}, reconcile will catch up: {e}")
+        return
+    finally:
+        # Again once totals are current: drops anything a read cached while they were refreshing
+        public_cache.expire()
+    progress = _pot_progress(pot_ids)
+    pot_events.publish(progress)
+    live_hub.publish("pots", progress)
+
+
+SESSION_STATES = ("created", "pending", "paid", "failed")
+PAYMENT_METHODS = ("razorpay", "upi")
+
+
+async def transition_session(to_state, from_states, session_id=None, order_id=None, fields=None, expected_amount=None):
+    """Move a session (found by id or Razorpay order id) to to_state if it is currently in from_states.
+
+    One round trip: the database checks and updates the session, its
+    allocations follow, and the affected pot_totals rows come back with the
+    result. Returns {found, transitioned, status, session, allocations, pot_totals};
+    a paid/failed transition is fed to _record_status_change.
+    """
+    result = await sb_rpc("transition_session", {
+        "p_from_states": list(from_states), "p_to_state": to_state,
+        "p_session_id": session_id, "p_order_id": order_id,
+        "p_fields": fields or {}, "p_expected_amount": expected_amount
+    })
+    if result.get("transitioned") and to_state in ("paid", "failed"):
+        session = result["session"]
+        await _record_status_change(session["id"], to_state, result["allocations"], session, result["pot_totals"])
+    return result
+
+
+# Webhook queue: accept Razorpay events into a local WAL file, apply them in the background
+# Holds events Razorpay has been told are received: keep it on a persistent volume, never tmpfs
+WEBHOOK_QUEUE_PATH = os.environ.get('WEBHOOK_QUEUE_PATH', str(ROOT_DIR / 'data' / 'webhooks.sqlite3'))
+WEBHOOK_WORKERS = int(os.environ.get('WEBHOOK_WORKERS', '4'))
+WEBHOOK_BATCH_SIZE = int(os.environ.get('WEBHOOK_BATCH_SIZE', '50'))
+WEBHOOK_MAX_ATTEMPTS = int(os.environ.get('WEBHOOK_MAX_ATTEMPTS', '12'))
+WEBHOOK_RETRY_BASE_SECONDS = 1
+WEBHOOK_RETRY_MAX_SECONDS = 300
+WEBHOOK_RETENTION_SECONDS = 7 * 86400  # processed ids kept this long to drop redeliveries
+# Claim lease, renewed every third of it while the batch runs; a batch whose worker died is taken back after this long
+WEBHOOK_LEASE_SECONDS = float(os.environ.get('WEBHOOK_LEASE_SECONDS', '60'))
+WEBHOOK_ERROR_BACKOFF_MAX_SECONDS = 30
+
+
+class WebhookQueue:
+    """Durable webhook inbox: pending -> done, or back to pending with backoff, or dead.
+
+    gateway_event_id is unique in the file, so a redelivered event is accepted
+    but never applied twice. SQLite work runs in a thread under one lock; the
+    file is fsynced on every append because an acknowledged event must survive
+    a crash. Workers sharing the file claim batches under their own name with
+    a lease they renew while the batch runs, so only a batch whose worker
+    died or hung is taken over (and that counts as one of its attempts).
+    """
+
+    def __init__(self, path=WEBHOOK_QUEUE_PATH):
+        self.owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=FULL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS webhook_queue ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT, gateway_event_id TEXT UNIQUE NOT NULL,"
+            " event_type TEXT NOT NULL, payload TEXT NOT NULL, received_at REAL NOT NULL,"
+            " state TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0,"
+            " next_attempt_at REAL NOT NULL, processed_at REAL, last_error TEXT)"
+        )
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(webhook_queue)")}
+        if "claimed_by" not in columns:  # files created before claims had owners
+            self.db.execute("ALTER TABLE webhook_queue ADD COLUMN claimed_by TEXT")
+            self.db.execute("ALTER TABLE webhook_queue ADD COLUMN lease_until REAL")
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_webhook_queue_due ON webhook_queue(state, next_attempt_at)")
+        self.lock = threading.Lock()
+        self.wakeup = asyncio.Event()
+        self.last_lag = 0.0  # seconds from receipt to applied, most recent batch
+
+    def _run(self, sql, args=()):
+        with self.lock:
+            return self.db.execute(sql, args).fetchall()
+
+    async def append(self, event_id, event_type, payload):
+        """Store an event; False if this gateway_event_id was already queued.
+
+        A redelivery of an event that gave up earlier puts it back in the queue.
+        """
+        now = time.time()
+        rows = await asyncio.to_thread(
+            self._run,
+            "INSERT INTO webhook_queue (gateway_event_id, event_type, payload, received_at, next_attempt_at) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT(gateway_event_id) DO UPDATE SET state = 'pending', attempts = 0, "
+            "next_attempt_at = excluded.next_attempt_at WHERE state = 'dead' RETURNING seq",
+            (event_id, event_type, payload, now, now)
+        )
+        if rows:
+            self.wakeup.set()
+        return bool(rows)
+
+    def _claim(self, limit):
+        now = time.time()
+        with self.lock:
+            return self.db.execute(
+                "UPDATE webhook_queue SET state = 'processing', claimed_by = ?, lease_until = ? WHERE seq IN ("
+                " SELECT seq FROM webhook_queue WHERE state = 'pending' AND next_attempt_at <= ?"
+                " ORDER BY seq LIMIT ?) RETURNING seq, gateway_event_id, event_type, payload, received_at, attempts",
+                (self.owner, now + WEBHOOK_LEASE_SECONDS, now, limit)
+            ).fetchall()
+
+    def _renew(self, seqs):
+        """Push out the lease on a batch this worker is still applying."""
+        self._run(
+            f"UPDATE webhook_queue SET lease_until = ? WHERE state = 'processing' AND claimed_by = ? "
+            f"AND seq IN ({','.join('?' * len(seqs))})",
+            (time.time() + WEBHOOK_LEASE_SECONDS, self.owner, *seqs)
+        )
+
+    async def _keep_leases(self, seqs):
+        while True:
+            await asyncio.sleep(WEBHOOK_LEASE_SECONDS / 3)
+            try:
+                await asyncio.to_thread(self._renew, seqs)
+            except Exception as e:
+                logger.warning(f"Webhook lease renewal failed for {len(seqs)} events: {e!r}")
+
+    def _expire_leases(self):
+        """Take back events whose claim lease ran out (their worker died or hung mid-batch).
+
+        A lost claim counts as an attempt, so an event that keeps killing its
+        worker goes dead after WEBHOOK_MAX_ATTEMPTS instead of being claimed
+        forever. Returns the event ids that have now given up.
+        """
+        now = time.time()
+        rows = self._run(
+            "UPDATE webhook_queue SET state = CASE WHEN attempts + 1 >= ? THEN 'dead' ELSE 'pending' END, "
+            "attempts = attempts + 1, next_attempt_at = ?, last_error = 'claim lease expired', claimed_by = NULL "
+            "WHERE state = 'processing' AND COALESCE(lease_until, 0) < ? RETURNING gateway_event_id, state, attempts",
+            (WEBHOOK_MAX_ATTEMPTS, now, now)
+        )
+        dead = [event_id for event_id, state, _ in rows if state == "dead"]
+        for event_id, state, attempts in rows:
+            if state == "dead":
+                logger.error(f"Webhook event {event_id} gave up after {attempts} attempts: claim lease expired")
+        return dead
+
+    def _finish(self, done, failed):
+        """Record a batch's outcome; returns the event ids that have now given up.
+
+        Only rows still claimed by this worker are touched: if the lease ran
+        out and another worker took the batch over, its outcome wins.
+        """
+        now = time.time()
+        dead = []
+        with self.lock:
+            try:
+                self.db.execute("BEGIN")
+                self.db.executemany(
+                    "UPDATE webhook_queue SET state = 'done', processed_at = ?, last_error = NULL, claimed_by = NULL "
+                    "WHERE seq = ? AND claimed_by = ?",
+                    [(now, seq, self.owner) for seq in done]
+                )
+                for seq, event_id, attempts, error in failed:
+                    delay = min(WEBHOOK_RETRY_BASE_SECONDS * 2 ** attempts, WEBHOOK_RETRY_MAX_SECONDS)
+                    state = "dead" if attempts + 1 >= WEBHOOK_MAX_ATTEMPTS else "pending"
+                    updated = self.db.execute(
+                        "UPDATE webhook_queue SET state = ?, attempts = attempts + 1, next_attempt_at = ?, "
+                        "last_error = ?, claimed_by = NULL WHERE seq = ? AND claimed_by = ?",
+                        (state, now + delay * random.uniform(0.5, 1.0), error, seq, self.owner)
+                    ).rowcount
+                    if state == "dead" and updated:
+                        dead.append(event_id)
+                        logger.error(f"Webhook event {seq} gave up after {attempts + 1} attempts: {error}")
+                self.db.execute("DELETE FROM webhook_queue WHERE state = 'done' AND processed_at < ?",
+                                (now - WEBHOOK_RETENTION_SECONDS,))
+                self.db.execute("COMMIT")
+            except BaseException:
+                # Leave the shared connection usable; the rows stay claimed until the lease runs out
+                if self.db.in_transaction:
+                    self.db.execute("ROLLBACK")
+                raise
+        return dead
+
+    def recover(self):
+        """Events whose claim lease ran out (their worker died mid-batch) go back to pending.
+
+        Batches held by live workers, which renew their leases while they run, are left alone.
+        """
+        self._expire_leases()
+
+    async def run(self):
+        """Claim due events in batches, record them in webhook_events, then apply them."""
+        sem = asyncio.Semaphore(WEBHOOK_WORKERS)
+
+        async def apply(row):
+            async with sem:
+                try:
+                    await _apply_webhook_event(json.loads(row[3]))
+                    return None
+                except Exception as e:
+                    logger.warning(f"Webhook event {row[1]} failed (attempt {row[5] + 1}): {e!r}")
+                    return getattr(e, "detail", None) or repr(e)
+
+        backoff = WEBHOOK_RETRY_BASE_SECONDS
+        while True:
+            try:
+                if not await self._run_batch(apply):
+                    self.wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self.wakeup.wait(), timeout=1)
+                    except asyncio.TimeoutError:
+                        pass
+                backoff = WEBHOOK_RETRY_BASE_SECONDS
+            except Exception as e:
+                # e.g. "database is locked": keep the only worker alive, claimed rows come back after their lease
+                logger.error(f"Webhook queue worker error, retrying in {backoff}s: {e!r}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, WEBHOOK_ERROR_BACKOFF_MAX_SECONDS)
+
+    async def _run_batch(self, apply):
+        """Claim, record and apply one batch; False if nothing was due."""
+        for event_id in await asyncio.to_thread(self._expire_leases):
+            _seen_webhook_events.discard(event_id)
+        rows = await asyncio.to_thread(self._claim, WEBHOOK_BATCH_SIZE)
+        if not rows:
+            return False
+        heartbeat = asyncio.create_task(self._keep_leases([row[0] for row in rows]))
+        try:
+            await sb_upsert("webhook_events", [{
+                "gateway_event_id": event_id, "event_type": event_type, "payload_json": json.loads(payload),
+                "received_at": datetime.fromtimestamp(received_at, timezone.utc).isoformat()
+            } for _, event_id, event_type, payload, received_at, _ in rows],
+                on_conflict="gateway_event_id", ignore_duplicates=True)
+            errors = await asyncio.gather(*(apply(row) for row in rows))
+        except Exception as e:
+            logger.warning(f"Webhook batch of {len(rows)} not recorded: {e!r}")
+            errors = [getattr(e, "detail", None) or repr(e)] * len(rows)
+        finally:
+            heartbeat.cancel()
+        done = [row[0] for row, error in zip(rows, errors) if error is None]
+        failed = [(row[0], row[1], row[5], error) for row, error in zip(rows, errors) if error is not None]
+        # A redelivery of a dead event must reach the queue again to revive it
+        for event_id in await asyncio.to_thread(self._finish, done, failed):
+            _seen_webhook_events.discard(event_id)
+        if done:
+            self.last_lag = time.time() - min(row[4] for row in rows)
+        return True
+
+    def stats(self):
+        counts = dict(self._run("SELECT state, COUNT(*) FROM webhook_queue GROUP BY state"))
+        oldest = self._run("SELECT MIN(received_at) FROM webhook_queue WHERE state IN ('pending', 'processing')")[0][0]
+        return {
+            "depth": counts.get("pending", 0) + counts.get("processing", 0),
+            "dead": counts.get("dead", 0),
+            "oldest_pending_seconds": round(time.time() - oldest, 1) if oldest else 0,
+            "last_lag_seconds": round(self.last_lag, 3)
+        }
+
+
+webhook_queue = WebhookQueue()
+
+
+async def _apply_webhook_event(payload):
+    """Apply one Razorpay event to its session (idempotent: an already-paid session is left alone)."""
+    if payload.get("event") not in ("payment.captured", "order.paid"):
+        return
+    pe = payload.get("payload", {}).get("payment", {}).get("entity", {})
+    order_id = pe.get("order_id")
+    payment_id = pe.get("id")
+    amount = pe.get("amount")
+    if not order_id:
+        return
+
+    result = await transition_session(
+        "paid", ("created", "pending", "failed"), order_id=order_id,
+        fields={"razorpay_payment_id": payment_id}, expected_amount=amount or 0
+    )
+    if result.get("transitioned"):
+        logger.info(f"Payment confirmed for session {result['session']['id']}")
+    elif result.get("status") == "paid":
+        _settled_orders.add(order_id)
+    elif result.get("amount_mismatch"):
+        logger.warning(f"Amount mismatch: expected {result['expected_amount']}, got {amount}")
+
+
+def _webhook_order_id(payload):
+    if payload.get("event") in ("payment.captured", "order.paid"):
+        return payload.get("payload", {}).get("payment", {}).get("entity", {}).get("order_id")
+    return None
+
+
+async def _seed_webhook_replay_filter():
+    """Load recent event ids and paid order ids so replays are caught right after a restart."""
+    events, sessions = await asyncio.gather(
+        sb_get("webhook_events", {
+            "select": "gateway_event_id", "order": "received_at.desc", "limit": str(WEBHOOK_REPLAY_CACHE_SIZE)
+        }),
+        sb_get("contribution_sessions", {
+            "select": "razorpay_order_id", "status": "eq.paid", "razorpay_order_id": "not.is.null",
+            "order": "paid_at.desc.nullslast", "limit": str(WEBHOOK_REPLAY_CACHE_SIZE)
+        })
+    )
+    # Oldest first so the most recent end up least likely to be evicted
+    for row in reversed(events):
+        _seen_webhook_events.add(row["gateway_event_id"])
+    for row in reversed(sessions):
+        _settled_orders.add(row["razorpay_order_id"])
+
+
+# Site settings cache
+SETTINGS_CACHE_TTL_SECONDS = int(os.environ.get('SETTINGS_CACHE_TTL_SECONDS', '300'))
+
+
+class SiteSettings:
+    """In-process copy of site_settings: loaded at startup, written through on save.
+
+    Reads never wait on the database. Once the copy is older than the TTL
+    (another worker may have saved) a reload starts in the background and the
+    current values keep being served; until the first load, defaults are.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.loaded_at = None
+        self._loading = None
+
+    def get(self, key, default=None):
+        if self.loaded_at is None or time.time() - self.loaded_at > SETTINGS_CACHE_TTL_SECONDS:
+            self.reload_soon()
+        return self.values.get(key) or default
+
+    async def load(self):
+        rows = await sb_get("site_settings", {"select": "setting_key,setting_value"})
+        self.values = {r["setting_key"]: r["setting_value"] for r in rows}
+        self.loaded_at = time.time()
+
+    async def read(self, keys):
+        """Current values of keys straight from the table, for payments: another worker may have just saved."""
+        rows = await sb_get("site_settings", {
+            "select": "setting_key,setting_value", "setting_key": f"in.({','.join(keys)})"
+        }, cache_ttl=0)
+        fresh = {r["setting_key"]: r["setting_value"] for r in rows}
+        self.values.update(fresh)
+        return fresh
+
+    def reload_soon(self):
+        if self._loading is None or self._loading.done():
+            self._loading = asyncio.create_task(self._reload())
+
+    async def _reload(self):
+        try:
+            await self.load()
+        except Exception as e:
+            logger.warning(f"Site settings reload failed, serving cached values: {e}")
+
+    async def update(self, changes):
+        """Save changed keys in one upsert, then update the cache from what was stored."""
+        now = datetime.now(timezone.utc).isoformat()
+        rows = await sb_upsert("site_settings", [
+            {"setting_key": key, "setting_value": value, "updated_at": now} for key, value in changes.items()
+        ], on_conflict="setting_key")
+        self.values.update({r["setting_key"]: r["setting_value"] for r in rows})
+        return {r["setting_key"]: r["setting_value"] for r in rows}
+
+    def stats(self):
+        return {"keys": len(self.values),
+                "age_seconds": round(time.time() - self.loaded_at, 1) if self.loaded_at else None}
+
+
+site_settings = SiteSettings()
 
 
 # Auth
@@ -116,7 +1252,51 @@ def get_admin_token(authorization: str = Header(None)):
 
 
 # App
-app = FastAPI(title="Shvetha & Aadi Wedding Gifts")
+BACKGROUND_RESTART_SECONDS = 5
+
+
+async def _supervise(name, start):
+    """Keep a background loop alive: restart it after a pause if it ever returns or crashes."""
+    while True:
+        try:
+            await start()
+            logger.error(f"{name} stopped, restarting in {BACKGROUND_RESTART_SECONDS}s")
+        except Exception as e:
+            logger.exception(f"{name} crashed, restarting in {BACKGROUND_RESTART_SECONDS}s: {e!r}")
+        await asyncio.sleep(BACKGROUND_RESTART_SECONDS)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    get_sb_client()
+    try:
+        await pot_totals.rebuild()
+    except Exception as e:
+        logger.warning(f"Pot totals not built at startup, will build on first read: {e}")
+    reconcile_task = asyncio.create_task(_reconcile_pot_totals())
+    webhook_queue.recover()
+    try:
+        await _seed_webhook_replay_filter()
+    except Exception as e:
+        logger.warning(f"Webhook replay filter not seeded, the queue still dedupes: {e}")
+    try:
+        await site_settings.load()
+    except Exception as e:
+        logger.warning(f"Site settings not loaded at startup, serving defaults: {e}")
+    try:
+        await blessings_ring.sync()
+    except Exception as e:
+        logger.warning(f"Blessings ring not filled at startup, will fill on first read: {e}")
+    webhook_task = asyncio.create_task(_supervise("Webhook queue worker", webhook_queue.run))
+    yield
+    reconcile_task.cancel()
+    webhook_task.cancel()
+    await close_sb_client()
+    _razorpay_executor.shutdown(wait=False, cancel_futures=True)
+    razorpay_client.session.close()
+
+
+app = FastAPI(title="Shvetha & Aadi Wedding Gifts", lifespan=lifespan)
 api_router = APIRouter(prefix="/api")
 
 
@@ -128,12 +1308,38 @@ async def root():
 @api_router.get("/health")
 async def health():
     try:
-        await sb_get("pots", {"select": "id", "limit": "1"})
+        # Never from sb_cache: the point is whether Supabase answers right now
+        await sb_get("pots", {"select": "id", "limit": "1"}, cache_ttl=0)
         return {"status": "ok", "database": True}
     except Exception:
         return {"status": "ok", "database": False}
 
 
+@api_router.get("/admin/stats")
+async def admin_stats(admin=Depends(get_admin_token)):
+    """Runtime stats for sizing the server on the day."""
+    return {
+        "supabase_pool": sb_pool_stats(),
+        "pot_totals": pot_totals.stats(),
+        "pot_stream": {"subscribers": pot_events.subscribers, "last_event_id": pot_events.last_id},
+        "session_waiters": len(session_waiters),
+        "rate_limit": {"backend": RATE_LIMIT_BACKEND, "keys": len(_rate_store),
+                       "busy_allowed": getattr(_rate_store, "busy", 0)},
+        "razorpay": {"pool_size": RAZORPAY_POOL_SIZE, "in_flight": _razorpay_in_flight},
+        "webhook_queue": await asyncio.to_thread(webhook_queue.stats),
+        "site_settings": site_settings.stats(),
+        "sb_cache": sb_cache.stats(),
+        "single_flight": single_flight.stats(),
+        "public_cache": public_cache.stats(),
+        "blessings_ring": blessings_ring.stats(),
+        "live": live_hub.stats(),
+        "webhook_replay_filter": {
+            "event_ids": len(_seen_webhook_events), "settled_orders": len(_settled_orders),
+            "replays_dropped": _webhook_replays
+        }
+    }
+
+
 # ---- AUTH ----
 @api_router.post("/admin/login")
 async def admin_login(request: Request):
@@ -148,94 +1354,247 @@ async def admin_login(request: Request):
 
 
 # ---- PUBLIC POTS ----
+class SingleFlight:
+    """Concurrent calls with the same key share one in-flight computation and its result.
+
+    Waiters await the shared task through asyncio.shield, so a guest who
+    disconnects doesn't cancel the work for everyone else.
+    """
+
+    def __init__(self):
+        self.flights = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn):
+        task = self.flights.get(key)
+        if task is None:
+            task = asyncio.create_task(fn())
+            self.flights[key] = task
+            self.started += 1
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key, task):
+        if self.flights.get(key) is task:
+            del self.flights[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every waiter went away
+
+    def stats(self):
+        return {"in_flight": len(self.flights), "started": self.started, "coalesced": self.coalesced}
+
+
+single_flight = SingleFlight()
+
+# Stale-while-revalidate for guest-facing reads
+PUBLIC_CACHE_FRESH_SECONDS = float(os.environ.get('PUBLIC_CACHE_FRESH_SECONDS', '5'))
+PUBLIC_CACHE_STALE_SECONDS = float(os.environ.get('PUBLIC_CACHE_STALE_SECONDS', '300'))
+# Browsers may keep a copy but must revalidate it; unchanged data comes back as a bodiless 304
+PUBLIC_CACHE_CONTROL = "public, no-cache"
+
+
+class PublicCache:
+    """Last good JSON body per public endpoint key, with its ETag and fill time.
+
+    Fresh entries are served as is; stale ones (aged past the fresh window)
+    are served at once while one background refresh runs; past the stale
+    window the caller waits for the refresh. A write drops every entry, so
+    the next read after it always loads afresh. Errors (404s included) are
+    never stored.
+    """
+
+    def __init__(self):
+        self.entries = {}  # key -> (body bytes, etag, filled_at)
+        self.generation = 0
+        self.hits = Counter()
+
+    def _flight(self, key):
+        # Loads are shared per generation: a read after a write never joins a load started before it
+        return ("public", key, self.generation)
+
+    async def fill(self, key, loader):
+        generation = self.generation
+        body = json.dumps(await loader(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        # Strong ETag from the bytes: identical across workers and refreshes while the data is unchanged
+        etag = f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+        entry = (body, etag, time.monotonic())
+        if generation == self.generation:
+            self.entries[key] = entry
+        # else data changed while loading: answer the callers who asked before the write, keep nothing
+        return entry
+
+    def refresh_soon(self, key, loader):
+        flight = self._flight(key)
+
+        async def refresh():
+            try:
+                await single_flight.do(flight, lambda: self.fill(key, loader))
+            except Exception as e:
+                logger.warning(f"Background refresh of {key} failed, serving stale: {e!r}")
+        if flight not in single_flight.flights:
+            asyncio.create_task(refresh())
+
+    async def get(self, key, loader):
+        entry = self.entries.get(key)
+        age = time.monotonic() - entry[2] if entry else None
+        if entry and age < PUBLIC_CACHE_FRESH_SECONDS:
+            self.hits["fresh"] += 1
+        elif entry and age < PUBLIC_CACHE_FRESH_SECONDS + PUBLIC_CACHE_STALE_SECONDS:
+            self.hits["stale"] += 1
+            self.refresh_soon(key, loader)
+        else:
+            self.hits["miss"] += 1
+            entry = await single_flight.do(self._flight(key), lambda: self.fill(key, loader))
+        return entry
+
+    def expire(self):
+        """Data changed: drop everything, so the writer's next read can't see the old body."""
+        self.generation += 1
+        self.entries.clear()
+
+    def stats(self):
+        return {"entries": len(self.entries), **self.hits}
+
+
+public_cache = PublicCache()
+
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+async def _serve_public(request, key, loader):
+    body, etag, filled_at = await public_cache.get(key, loader)
+    headers = {"ETag": etag, "Cache-Control": PUBLIC_CACHE_CONTROL, "Age": str(int(time.monotonic() - filled_at))}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        public_cache.hits["not_modified"] += 1
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# Paid sessions/allocations change on every payment; in this process the
+# transition RPC invalidates them, other workers catch up within this TTL
+PUBLIC_LIST_CACHE_TTL = 10
+
+
 @api_router.get("/pots")
-async def list_pots():
+async def list_pots(request: Request):
+    return await _serve_public(request, "pots", _list_pots)
+
+
+async def _list_pots():
+    if not pot_totals.ready:
+        # Cold cache: one RPC returns pots with totals and names while the cache builds
+        pot_totals.warm()
+        return await sb_rpc("pot_listing")
     pots = await sb_get("pots", {
         "select": "id,title,slug,story_text,cover_image_url,goal_amount_paise,is_active,created_at",
         "is_active": "eq.true",
         "order": "created_at.desc"
     })
-    allocs = await sb_get("allocations", {
-        "select": "pot_id,amount_paise,session_id",
-        "status": "eq.paid"
-    })
-    pot_totals = defaultdict(int)
-    pot_sessions = defaultdict(set)
-    for a in allocs:
-        pot_totals[a["pot_id"]] += a["amount_paise"]
-        pot_sessions[a["pot_id"]].add(a["session_id"])
-
-    all_sids = set()
-    for sids in pot_sessions.values():
-        all_sids.update(sids)
-
-    session_names = {}
-    if all_sids:
-        slist = ",".join(all_sids)
-        sessions = await sb_get("contribution_sessions", {
-            "select": "id,donor_name",
-            "id": f"in.({slist})"
-        })
-        session_names = {s["id"]: s["donor_name"] for s in sessions}
+    return [{
+        **pot,
+        "total_raised_paise": pot_totals.total(pot["id"]),
+        "contributor_names": pot_totals.contributor_names(pot["id"]),
+        "contributor_count": pot_totals.contributor_count(pot["id"])
+    } for pot in pots]
+
+
+@api_router.get("/pots/stream")
+async def stream_pots(request: Request, last_event_id: str = Header(None)):
+    """Server-Sent Events feed of per-pot total_raised_paise / contributor_count deltas.
+
+    Sends a full snapshot on connect (or when a Last-Event-ID can't be resumed),
+    then one event per confirmed payment and a comment heartbeat while idle.
+    """
+    await pot_totals.ensure_ready()
+    try:
+        cursor = int(last_event_id) if last_event_id else None
+    except ValueError:
+        cursor = None
 
-    result = []
-    for pot in pots:
-        names = []
-        for sid in pot_sessions.get(pot["id"], set()):
-            n = session_names.get(sid, "Guest")
-            if n not in names:
-                names.append(n)
-        result.append({
-            **pot,
-            "total_raised_paise": pot_totals.get(pot["id"], 0),
-            "contributor_names": names[:10],
-            "contributor_count": len(names)
-        })
-    return result
+    async def events():
+        nonlocal cursor
+        pot_events.subscribers += 1
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                pending = pot_events.since(cursor) if cursor is not None else None
+                if pending is None:
+                    cursor = pot_events.last_id
+                    snapshot = json.dumps(_pot_progress(list(pot_totals.rows)), separators=(",", ":"))
+                    yield f"id: {cursor}\nevent: snapshot\ndata: {snapshot}\n\n"
+                    continue
+                if pending:
+                    for event_id, data in pending:
+                        yield f"id: {event_id}\nevent: pots\ndata: {data}\n\n"
+                    cursor = pending[-1][0]
+                    continue
+                if not await pot_events.wait(POT_STREAM_HEARTBEAT_SECONDS):
+                    yield ": ping\n\n"
+        finally:
+            pot_events.subscribers -= 1
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache", "X-Accel-Buffering": "no"
+    })
 
 
 @api_router.get("/pots/{slug}")
-async def get_pot(slug: str):
+async def get_pot(slug: str, request: Request):
+    return await _serve_public(request, ("pot", slug), lambda: _get_pot(slug))
+
+
+async def _get_pot(slug):
     pots = await sb_get("pots", {"select": "*", "slug": f"eq.{slug}"})
     if not pots:
         raise HTTPException(404, "Pot not found")
     pot = pots[0]
-    items = await sb_get("pot_items", {
-        "select": "*", "pot_id": f"eq.{pot['id']}", "order": "sort_order.asc"
-    })
-    allocs = await sb_get("allocations", {
-        "select": "amount_paise", "pot_id": f"eq.{pot['id']}", "status": "eq.paid"
-    })
-    return {**pot, "items": items, "total_raised_paise": sum(a["amount_paise"] for a in allocs)}
+    items, totals = await asyncio.gather(
+        sb_get("pot_items", {"select": "*", "pot_id": f"eq.{pot['id']}", "order": "sort_order.asc"}),
+        pot_totals.read([pot["id"]])
+    )
+    return {**pot, "items": items, "total_raised_paise": totals.get(pot["id"], {}).get("raised_paise", 0)}
 
 
 @api_router.get("/pots/{slug}/contributors")
-async def get_contributors(slug: str):
+async def get_contributors(slug: str, request: Request):
+    return await _serve_public(request, ("contributors", slug), lambda: _get_contributors(slug))
+
+
+async def _get_contributors(slug):
     pots = await sb_get("pots", {"select": "id", "slug": f"eq.{slug}"})
     if not pots:
         raise HTTPException(404, "Pot not found")
     allocs = await sb_get("allocations", {
         "select": "session_id", "pot_id": f"eq.{pots[0]['id']}", "status": "eq.paid"
-    })
-    sids = list(set(a["session_id"] for a in allocs))
-    if not sids:
-        return []
-    sessions = await sb_get("contribution_sessions", {
+    }, cache_ttl=PUBLIC_LIST_CACHE_TTL)
+    sessions = await sb_get_in("contribution_sessions", "id", [a["session_id"] for a in allocs], {
         "select": "id,donor_name,donor_message,paid_at",
-        "id": f"in.({','.join(sids)})",
         "order": "paid_at.desc.nullslast"
-    })
+    }, cache_ttl=PUBLIC_LIST_CACHE_TTL)
+    sessions.sort(key=lambda s: s.get("paid_at") or "", reverse=True)
     return [{"donor_name": s["donor_name"], "donor_message": s.get("donor_message", ""), "paid_at": s.get("paid_at")} for s in sessions if s.get("donor_name")]
 
 
 @api_router.get("/blessings/all")
-async def get_all_blessings():
+async def get_all_blessings(request: Request):
     """Get all blessings across all pots"""
+    return await _serve_public(request, "blessings", _get_all_blessings)
+
+
+async def _get_all_blessings():
     sessions = await sb_get("contribution_sessions", {
         "select": "id,donor_name,donor_message,paid_at",
         "status": "eq.paid",
         "order": "paid_at.desc.nullslast"
-    })
+    }, cache_ttl=PUBLIC_LIST_CACHE_TTL)
     return [
         {
             "donor_name": s["donor_name"], 
@@ -246,7 +1605,223 @@ async def get_all_blessings():
     ]
 
 
+# Blessings wall feed: newest-first keyset pages on (paid_at, id) plus since-deltas
+BLESSINGS_PAGE_SIZE = int(os.environ.get('BLESSINGS_PAGE_SIZE', '30'))
+BLESSINGS_RING_SIZE = int(os.environ.get('BLESSINGS_RING_SIZE', '200'))
+# Payments confirmed by other workers reach this one's ring within this long
+BLESSINGS_RING_SYNC_SECONDS = float(os.environ.get('BLESSINGS_RING_SYNC_SECONDS', '10'))
+BLESSINGS_FEED_PARAMS = {
+    "select": "id,donor_name,donor_message,paid_at",
+    "status": "eq.paid",
+    "paid_at": "not.is.null",
+    "donor_name": "neq."
+}
+
+
+def _blessing(session):
+    return {
+        "id": session["id"],
+        "donor_name": session["donor_name"],
+        "donor_message": session.get("donor_message") or "",
+        "paid_at": session["paid_at"]
+    }
+
+
+def _blessing_key(blessing):
+    return datetime.fromisoformat(blessing["paid_at"]), blessing["id"]
+
+
+def _cursor_key(cursor):
+    at, session_id = _decode_cursor(cursor)
+    return (at, session_id), (datetime.fromisoformat(at), session_id)
+
+
+class BlessingsRing:
+    """The newest BLESSINGS_RING_SIZE blessings, newest first, plus the total count.
+
+    Payments confirmed in this process are pushed in by _record_status_change
+    as they happen; a resync every BLESSINGS_RING_SYNC_SECONDS picks up those
+    confirmed elsewhere. First screens and since-deltas inside the ring are
+    answered without a database round trip.
+    """
+
+    def __init__(self, size):
+        self.items = deque(maxlen=size)
+        self.total = 0
+        self.complete = False  # the ring holds every blessing there is
+        self.synced_at = None
+        self.hits = Counter()
+
+    async def sync(self):
+        rows, total = await asyncio.gather(
+            sb_get("contribution_sessions", {
+                **BLESSINGS_FEED_PARAMS, "order": "paid_at.desc,id.desc", "limit": str(self.items.maxlen)
+            }, cache_ttl=0),
+            sb_count("contribution_sessions", {k: v for k, v in BLESSINGS_FEED_PARAMS.items() if k != "select"})
+        )
+        fetched = [_blessing(row) for row in rows]
+        # Keep pushes that landed while the query was in flight
+        head = _blessing_key(fetched[0]) if fetched else None
+        raced = [item for item in self.items if head is None or _blessing_key(item) > head]
+        self.items = deque((raced + fetched)[:self.items.maxlen], maxlen=self.items.maxlen)
+        self.total = total + len(raced)
+        self.complete = len(rows) < self.items.maxlen
+        self.synced_at = time.monotonic()
+
+    async def ensure_fresh(self):
+        if self.synced_at is None or time.monotonic() - self.synced_at > BLESSINGS_RING_SYNC_SECONDS:
+            await single_flight.do("blessings_ring", self.sync)
+
+    def push(self, session):
+        """Add a newly paid session; returns its blessing, or None if it has no name to show."""
+        if not session.get("donor_name") or not session.get("paid_at"):
+            return None
+        item = _blessing(session)
+        self.discard(item["id"])
+        if len(self.items) == self.items.maxlen:
+            self.complete = False
+        if not self.items or _blessing_key(item) > _blessing_key(self.items[0]):
+            self.items.appendleft(item)
+        else:
+            ordered = sorted([*self.items, item], key=_blessing_key, reverse=True)
+            self.items = deque(ordered[:self.items.maxlen], maxlen=self.items.maxlen)
+        self.total += 1
+        return item
+
+    def discard(self, session_id):
+        for item in self.items:
+            if item["id"] == session_id:
+                self.items.remove(item)
+                self.total = max(self.total - 1, 0)
+                return True
+        return False
+
+    def newer_than(self, key):
+        """Blessings after key, newest first; None if the ring can't vouch for the whole range."""
+        if self.synced_at is None or not self.complete and (not self.items or key < _blessing_key(self.items[-1])):
+            self.hits["miss"] += 1
+            return None
+        self.hits["since"] += 1
+        return [item for item in self.items if _blessing_key(item) > key]
+
+    def older_than(self, key, limit):
+        """Up to limit blessings before key (None: all of them), newest first; None if the ring runs out first."""
+        items = [item for item in self.items if key is None or _blessing_key(item) < key]
+        if self.synced_at is None or len(items) < (limit or 0) and not self.complete:
+            self.hits["miss"] += 1
+            return None
+        self.hits["page"] += 1
+        return items[:limit]
+
+    def stats(self):
+        age = time.monotonic() - self.synced_at if self.synced_at is not None else None
+        return {"size": len(self.items), "total": self.total, "complete": self.complete,
+                "synced_age_seconds": age, **self.hits}
+
+
+blessings_ring = BlessingsRing(BLESSINGS_RING_SIZE)
+
+
+@api_router.get("/blessings")
+async def list_blessings(
+    request: Request,
+    limit: int = Query(BLESSINGS_PAGE_SIZE, ge=1, le=100),
+    cursor: str = Query(None),
+    since: str = Query(None)
+):
+    """Blessings wall, newest first, one keyset page on (paid_at, id) at a time.
+
+    Without a cursor: the first screen, with the total count. cursor: the
+    page after next_cursor. since: only the blessings newer than a previous
+    latest_cursor; "reset" means more arrived than limit and the client
+    should reload the first screen instead.
+    """
+    if since:
+        return await _blessings_since(since, limit)
+    if cursor:
+        return await _blessings_page(cursor, limit)
+    return await _serve_public(request, ("blessings_feed", limit), lambda: _blessings_page(None, limit))
+
+
+async def _blessings_page(cursor, limit):
+    bound, key = _cursor_key(cursor) if cursor else (None, None)
+    await blessings_ring.ensure_fresh()
+    items = blessings_ring.older_than(key, limit + 1)
+    if items is None:
+        params = {**BLESSINGS_FEED_PARAMS, "order": "paid_at.desc,id.desc", "limit": str(limit + 1)}
+        if bound:
+            params["and"] = f"({','.join(_keyset_before(*bound, column='paid_at'))})"
+        items = [_blessing(row) for row in await sb_get("contribution_sessions", params, cache_ttl=0)]
+    page = {"items": items[:limit], "next_cursor": _encode_cursor(items[limit - 1], "paid_at") if len(items) > limit else None}
+    if not cursor:
+        page["latest_cursor"] = _encode_cursor(items[0], "paid_at") if items else None
+        page["total"] = blessings_ring.total
+    return page
+
+
+async def _blessings_since(since, limit):
+    bound, key = _cursor_key(since)
+    await blessings_ring.ensure_fresh()
+    items = blessings_ring.newer_than(key)
+    if items is None:
+        items = [_blessing(row) for row in await sb_get("contribution_sessions", {
+            **BLESSINGS_FEED_PARAMS, "order": "paid_at.desc,id.desc", "limit": str(limit + 1),
+            "and": f"({','.join(_keyset_after(*bound, column='paid_at'))})"
+        }, cache_ttl=0)]
+    if len(items) > limit:
+        return {"items": [], "latest_cursor": since, "reset": True, "total": blessings_ring.total}
+    return {
+        "items": items,
+        "latest_cursor": _encode_cursor(items[0], "paid_at") if items else since,
+        "reset": False,
+        "total": blessings_ring.total
+    }
+
+
+@api_router.websocket("/live")
+async def live(websocket: WebSocket):
+    """Venue display feed: a snapshot on connect, then "pots", "blessing" and
+    "blessing_removed" messages as payments confirm or are reversed.
+
+    Clients send nothing. One that can't keep up is closed with 1013 and
+    should reconnect for a fresh snapshot.
+    """
+    if len(live_hub.clients) >= LIVE_MAX_CLIENTS:
+        await websocket.close(code=1013)
+        return
+    await websocket.accept()
+    await pot_totals.ensure_ready()
+    await blessings_ring.ensure_fresh()
+    queue = live_hub.subscribe()
+
+    async def send():
+        await websocket.send_text(live_hub.snapshot())
+        while (message := await queue.get()) is not None:
+            await websocket.send_text(message)
+        await websocket.close(code=1013, reason="Too far behind, reconnect")
+
+    async def receive():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    tasks = [asyncio.create_task(send()), asyncio.create_task(receive())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        live_hub.unsubscribe(queue)
+        for task in tasks:
+            if task.done() and not task.cancelled():
+                task.exception()  # a send to a client that just vanished; nothing to report
+            task.cancel()
+
+
 # ---- SESSION ----
+def _allocation_args(allocations_data):
+    return [{
+        "pot_id": a.get("pot_id"), "pot_item_id": a.get("pot_item_id"), "amount_paise": a.get("amount_paise")
+    } for a in allocations_data]
+
+
 @api_router.post("/session/create-or-update")
 async def create_or_update_session(request: Request):
     data = await request.json()
@@ -266,38 +1841,19 @@ async def create_or_update_session(request: Request):
     if not allocations_data:
         raise HTTPException(400, "At least one allocation is required")
 
-    total = 0
-    for alloc in allocations_data:
-        amt = int(alloc.get("amount_paise", 0))
-        if amt <= 0:
-            raise HTTPException(400, "Amounts must be positive")
-        total += amt
-
-    fee = int(total * 0.0236) if cover_fees else 0
-
-    if session_id:
-        existing = await sb_get("contribution_sessions", {"select": "id,status", "id": f"eq.{session_id}"})
-        if not existing or existing[0]["status"] != "created":
-            raise HTTPException(400, "Session cannot be updated")
-        await sb_delete("allocations", {"session_id": f"eq.{session_id}"})
-        await sb_patch("contribution_sessions", {
-            "donor_name": donor_name, "donor_email": donor_email,
-            "donor_phone": donor_phone, "donor_message": donor_message,
-            "total_amount_paise": total, "fee_amount_paise": fee
-        }, {"id": f"eq.{session_id}"})
-    else:
-        result = await sb_post("contribution_sessions", {
+    # One transaction: validate the cart, insert/update the session, replace its allocations
+    result = await sb_rpc("upsert_contribution_session", {
+        "p_session_id": session_id,
+        "p_donor": {
             "donor_name": donor_name, "donor_email": donor_email,
-            "donor_phone": donor_phone, "donor_message": donor_message,
-            "total_amount_paise": total, "fee_amount_paise": fee, "status": "created"
-        })
-        session_id = result[0]["id"]
-
-    alloc_records = [{
-        "session_id": session_id, "pot_id": a["pot_id"],
-        "pot_item_id": a.get("pot_item_id"), "amount_paise": int(a["amount_paise"]), "status": "pending"
-    } for a in allocations_data]
-    await sb_post("allocations", alloc_records)
+            "donor_phone": donor_phone, "donor_message": donor_message
+        },
+        "p_allocations": _allocation_args(allocations_data),
+        "p_fee_rate": RAZORPAY_FEE_RATE if cover_fees else 0,
+        "p_payment_method": "razorpay"
+    })
+    session_id = result["session_id"]
+    total, fee = result["total_amount_paise"], result["fee_amount_paise"]
 
     return {"session_id": session_id, "total_amount_paise": total, "fee_amount_paise": fee, "grand_total_paise": total + fee}
 
@@ -305,7 +1861,7 @@ async def create_or_update_session(request: Request):
 @api_router.get("/session/{session_id}")
 async def get_session(session_id: str):
     sessions = await sb_get("contribution_sessions", {
-        "select": "id,status,total_amount_paise,fee_amount_paise,razorpay_order_id,razorpay_payment_id,paid_at",
+        "select": SESSION_STATUS_FIELDS,
         "id": f"eq.{session_id}"
     })
     if not sessions:
@@ -313,86 +1869,55 @@ async def get_session(session_id: str):
     return sessions[0]
 
 
+@api_router.get("/session/{session_id}/wait")
+async def wait_for_session(session_id: str, timeout: int = Query(25, ge=1, le=55), status: str = Query(None)):
+    """Long-poll: return as soon as the session's status differs from `status` (the client's last seen
+    status; without it, as soon as the session is paid or failed), else its current row at timeout."""
+    latest = None
+
+    async def moved_on():
+        nonlocal latest
+        latest = await get_session(session_id)
+        if (latest["status"] != status) if status else latest["status"] in ("paid", "failed"):
+            return latest
+
+    session = await session_waiters.wait(session_id, timeout, moved_on)
+    if session is None:
+        return latest
+    return {k: session.get(k) for k in SESSION_STATUS_FIELDS.split(",")}
+
+
 @api_router.get("/session/{session_id}/progress")
 async def get_session_progress(session_id: str):
     """Get session allocations with pot progress data for Thank You page animation."""
-    # Get session allocations
-    allocations = await sb_get("allocations", {
-        "select": "pot_id,amount_paise",
-        "session_id": f"eq.{session_id}",
-        "order": "id.asc"
-    })
-    if not allocations:
+    cached = _progress_cache.get(session_id)
+    if cached:
+        _progress_cache.move_to_end(session_id)
+        return cached
+
+    # First pot (first allocation's), its goal, this session's share and the pot's paid total in one query
+    progress = await sb_rpc("session_progress", {"p_session_id": session_id})
+    if not progress:
         raise HTTPException(404, "No allocations found for session")
-    
-    # Get the first pot deterministically (first allocation's pot)
-    first_pot_id = allocations[0]["pot_id"]
-    session_allocation_for_pot = sum(a["amount_paise"] for a in allocations if a["pot_id"] == first_pot_id)
-    
-    # Get pot details (goal)
-    pots = await sb_get("pots", {
-        "select": "id,title,goal_amount_paise",
-        "id": f"eq.{first_pot_id}"
-    })
-    if not pots:
-        raise HTTPException(404, "Pot not found")
-    pot = pots[0]
-    
-    # Calculate current raised total for this pot from paid allocations
-    # Status can be "paid" (Razorpay confirmed) or allocations from sessions with status "paid"
-    paid_allocations = await sb_get("allocations", {
-        "select": "amount_paise",
-        "pot_id": f"eq.{first_pot_id}",
-        "status": "in.(pending,paid)"  # pending = SUBMITTED (UPI awaiting confirmation), paid = RECEIVED
-    })
-    
-    # Actually we need to match the logic in pots endpoint - let's get from sessions with paid status
-    # Get all allocations for this pot where the parent session is paid
-    all_pot_allocations = await sb_get("allocations", {
-        "select": "amount_paise,session_id",
-        "pot_id": f"eq.{first_pot_id}"
-    })
-    
-    # Get sessions that are paid
-    if all_pot_allocations:
-        session_ids = list(set(a["session_id"] for a in all_pot_allocations))
-        paid_sessions = await sb_get("contribution_sessions", {
-            "select": "id",
-            "id": f"in.({','.join(session_ids)})",
-            "status": "eq.paid"
-        })
-        paid_session_ids = set(s["id"] for s in paid_sessions)
-        
-        # Sum only allocations from paid sessions
-        current_raised = sum(
-            a["amount_paise"] for a in all_pot_allocations 
-            if a["session_id"] in paid_session_ids
-        )
-    else:
-        current_raised = 0
-    
-    # The animation should show: raised BEFORE this contribution → raised AFTER
-    # So we need raised_before = current_raised - session_allocation_for_pot (if this session is already paid)
-    # Check if this session is paid
-    sessions = await sb_get("contribution_sessions", {
-        "select": "status",
-        "id": f"eq.{session_id}"
-    })
-    session_is_paid = sessions and sessions[0]["status"] == "paid"
-    
-    if session_is_paid:
-        raised_before = current_raised - session_allocation_for_pot
-    else:
-        raised_before = current_raised
-    
-    return {
-        "pot_id": first_pot_id,
-        "pot_title": pot["title"],
-        "goal_amount_paise": pot.get("goal_amount_paise") or 0,
+
+    # The animation shows raised BEFORE this contribution -> raised AFTER
+    session_share = progress["session_contribution_paise"]
+    session_is_paid = progress["session_status"] == "paid"
+    raised_before = progress["raised_paise"] - session_share if session_is_paid else progress["raised_paise"]
+
+    result = {
+        "pot_id": progress["pot_id"],
+        "pot_title": progress["pot_title"],
+        "goal_amount_paise": progress["goal_amount_paise"],
         "raised_before_paise": raised_before,
-        "session_contribution_paise": session_allocation_for_pot,
-        "raised_after_paise": raised_before + session_allocation_for_pot
+        "session_contribution_paise": session_share,
+        "raised_after_paise": raised_before + session_share
     }
+    if session_is_paid:
+        _progress_cache[session_id] = result
+        if len(_progress_cache) > SESSION_PROGRESS_CACHE_SIZE:
+            _progress_cache.popitem(last=False)
+    return result
 
 
 
@@ -408,40 +1933,19 @@ async def create_upi_session(request: Request):
     if not allocations_data:
         raise HTTPException(400, "At least one allocation is required")
 
-    total = 0
-    for alloc in allocations_data:
-        amt = int(alloc.get("amount_paise", 0))
-        if amt <= 0:
-            raise HTTPException(400, "Amounts must be positive")
-        total += amt
-
-    session_data = {
-        "total_amount_paise": total,
-        "fee_amount_paise": 0,
-        "status": "created",
-        "donor_name": "",
-        "donor_email": "",
-        "donor_phone": "",
-    }
-    # payment_method and utr columns may not exist yet — try with them, fallback without
-    try:
-        session_data["payment_method"] = "upi"
-        result = await sb_post("contribution_sessions", session_data)
-    except Exception:
-        del session_data["payment_method"]
-        result = await sb_post("contribution_sessions", session_data)
-    session_id = result[0]["id"]
-
-    alloc_records = [{
-        "session_id": session_id,
-        "pot_id": a["pot_id"],
-        "pot_item_id": a.get("pot_item_id"),
-        "amount_paise": int(a["amount_paise"]),
-        "status": "pending"
-    } for a in allocations_data]
-    await sb_post("allocations", alloc_records)
+    # Donor details are collected after payment; the payee is read uncached so a just-saved UPI ID is used
+    result, payee = await asyncio.gather(
+        sb_rpc("upsert_contribution_session", {
+            "p_allocations": _allocation_args(allocations_data),
+            "p_payment_method": "upi"
+        }),
+        site_settings.read(("upi_id", "upi_name"))
+    )
+    session_id = result["session_id"]
+    total = result["total_amount_paise"]
 
-    return {"session_id": session_id, "total_amount_paise": total}
+    return {"session_id": session_id, "total_amount_paise": total,
+            "upi_id": payee.get("upi_id") or DEFAULT_UPI_ID, "upi_name": payee.get("upi_name") or DEFAULT_UPI_NAME}
 
 
 @api_router.post("/upi/blessing/confirm")
@@ -466,42 +1970,21 @@ async def confirm_upi_blessing(request: Request):
     if not re.match(r'^[^\s@]+@[^\s@]+\.[^\s@]+$', donor_email):
         raise HTTPException(400, "Please provide a valid email address")
 
-    sessions = await sb_get("contribution_sessions", {"select": "id,status", "id": f"eq.{session_id}"})
-    if not sessions:
-        raise HTTPException(404, "Session not found")
-    if sessions[0]["status"] not in ("created", "pending"):
-        raise HTTPException(400, f"Session already {sessions[0]['status']}")
-
-    now_iso = datetime.now(timezone.utc).isoformat()
-    
-    # Base update data (always works)
-    update_data = {
+    fields = {
         "donor_name": donor_name,
         "donor_phone": donor_phone,
         "donor_email": donor_email,
         "donor_message": donor_message,
-        "status": "paid",
-        "paid_at": now_iso
+        "submitted_at": datetime.now(timezone.utc).isoformat()
     }
-    
-    # Try with submitted_at first
-    try:
-        full_update = {**update_data, "submitted_at": now_iso}
-        if utr:
-            full_update["utr"] = utr
-        await sb_patch("contribution_sessions", full_update, {"id": f"eq.{session_id}"})
-        logger.info(f"Blessing confirmed with submitted_at for session {session_id}")
-    except Exception as e:
-        logger.warning(f"Could not save with submitted_at/utr, trying without: {e}")
-        # Fallback - try without submitted_at and utr
-        try:
-            await sb_patch("contribution_sessions", update_data, {"id": f"eq.{session_id}"})
-            logger.info(f"Blessing confirmed (without submitted_at) for session {session_id}")
-        except Exception as e2:
-            logger.error(f"Failed to update session {session_id}: {e2}")
-            raise HTTPException(500, "Could not save your blessing. Please try again.")
-    
-    await sb_patch("allocations", {"status": "paid"}, {"session_id": f"eq.{session_id}"})
+    if utr:
+        fields["utr"] = utr
+    result = await transition_session("paid", ("created", "pending"), session_id=session_id, fields=fields)
+    if not result["found"]:
+        raise HTTPException(404, "Session not found")
+    if not result["transitioned"]:
+        raise HTTPException(400, f"Session already {result['status']}")
+    logger.info(f"Blessing confirmed for session {session_id}")
 
     return {"status": "paid", "session_id": session_id, "donor_name": donor_name}
 
@@ -509,16 +1992,7 @@ async def confirm_upi_blessing(request: Request):
 @api_router.get("/config")
 async def get_config():
     """Return payment provider config to frontend."""
-    # Try to get UPI ID from database, fallback to default
-    upi_id = DEFAULT_UPI_ID
-    try:
-        settings = await sb_get("site_settings", {"select": "setting_value", "setting_key": "eq.upi_id"})
-        if settings and settings[0].get("setting_value"):
-            upi_id = settings[0]["setting_value"]
-    except Exception:
-        pass  # Table might not exist yet, use default
-    
-    return {"payment_provider": PAYMENT_PROVIDER, "upi_id": upi_id}
+    return {"payment_provider": PAYMENT_PROVIDER, "upi_id": site_settings.get("upi_id", DEFAULT_UPI_ID)}
 
 
 
@@ -549,17 +2023,19 @@ async def create_razorpay_order(request: Request):
     grand_total = session["total_amount_paise"] + session.get("fee_amount_paise", 0)
 
     try:
-        order = razorpay_client.order.create({
+        order = await razorpay_call(razorpay_client.order.create, {
             "amount": grand_total, "currency": "INR", "payment_capture": 1,
             "notes": {"session_id": session_id, "donor_name": session["donor_name"]}
         })
+    except asyncio.TimeoutError:
+        logger.error(f"Razorpay order creation timed out after {RAZORPAY_TIMEOUT}s")
+        raise HTTPException(504, "Payment gateway timeout")
     except Exception as e:
         logger.error(f"Razorpay order creation failed: {e}")
         raise HTTPException(502, "Payment gateway error")
 
-    await sb_patch("contribution_sessions", {
-        "status": "pending", "razorpay_order_id": order["id"]
-    }, {"id": f"eq.{session_id}"})
+    await transition_session("pending", ("created", "pending"), session_id=session_id,
+                             fields={"razorpay_order_id": order["id"]})
 
     return {
         "order_id": order["id"], "amount": grand_total, "currency": "INR",
@@ -580,37 +2056,21 @@ async def razorpay_webhook(request: Request):
         raise HTTPException(400, "Invalid signature")
 
     payload = json.loads(body)
-    event_type = payload.get("event", "")
-
-    await sb_post("webhook_events", {
-        "gateway_event_id": payload.get("id", str(uuid.uuid4())),
-        "event_type": event_type, "payload_json": payload,
-        "received_at": datetime.now(timezone.utc).isoformat()
-    })
-
-    if event_type in ("payment.captured", "order.paid"):
-        pe = payload.get("payload", {}).get("payment", {}).get("entity", {})
-        order_id = pe.get("order_id")
-        payment_id = pe.get("id")
-        amount = pe.get("amount")
-
-        if order_id:
-            sessions = await sb_get("contribution_sessions", {"select": "*", "razorpay_order_id": f"eq.{order_id}"})
-            if sessions:
-                sess = sessions[0]
-                if sess["status"] == "paid":
-                    return {"status": "already_processed"}
-                expected = sess["total_amount_paise"] + sess.get("fee_amount_paise", 0)
-                if amount and amount == expected:
-                    await sb_patch("contribution_sessions", {
-                        "status": "paid", "razorpay_payment_id": payment_id,
-                        "paid_at": datetime.now(timezone.utc).isoformat()
-                    }, {"razorpay_order_id": f"eq.{order_id}"})
-                    await sb_patch("allocations", {"status": "paid"}, {"session_id": f"eq.{sess['id']}"})
-                    logger.info(f"Payment confirmed for session {sess['id']}")
-                else:
-                    logger.warning(f"Amount mismatch: expected {expected}, got {amount}")
-
+    # Razorpay's event id is stable across redeliveries; fall back to the body's digest
+    event_id = (request.headers.get("x-razorpay-event-id") or payload.get("id")
+                or hashlib.sha256(body).hexdigest())
+
+    # Redeliveries and the second event for an already-paid order stop here, before any I/O
+    global _webhook_replays
+    if event_id in _seen_webhook_events or _webhook_order_id(payload) in _settled_orders:
+        _webhook_replays += 1
+        return {"status": "already_processed"}
+
+    # Acknowledge as soon as the event is durable; the queue worker does the database work
+    queued = await webhook_queue.append(event_id, payload.get("event", ""), body.decode("utf-8"))
+    _seen_webhook_events.add(event_id)
+    if not queued:
+        return {"status": "already_processed"}
     return {"status": "ok"}
 
 
@@ -663,16 +2123,17 @@ async def create_payment_link(request: Request):
                 "donor_name": session["donor_name"]
             }
         }
-        payment_link = razorpay_client.payment_link.create(link_data)
+        payment_link = await razorpay_call(razorpay_client.payment_link.create, link_data)
+    except asyncio.TimeoutError:
+        logger.error(f"Razorpay payment link creation timed out after {RAZORPAY_TIMEOUT}s")
+        raise HTTPException(504, "Payment gateway timeout")
     except Exception as e:
         logger.error(f"Razorpay payment link creation failed: {e}")
         raise HTTPException(502, "Payment gateway error")
 
     # Update session with payment link info
-    await sb_patch("contribution_sessions", {
-        "status": "pending",
-        "razorpay_order_id": payment_link.get("order_id", payment_link["id"])
-    }, {"id": f"eq.{session_id}"})
+    await transition_session("pending", ("created", "pending"), session_id=session_id,
+                             fields={"razorpay_order_id": payment_link.get("order_id", payment_link["id"])})
 
     return {
         "payment_link_url": payment_link["short_url"],
@@ -717,14 +2178,8 @@ async def payment_link_callback(request: Request):
         logger.info(f"Payment link callback: verified for session {session_id}, status={payment_link_status}")
 
         if payment_link_status == "paid" and session_id:
-            sessions = await sb_get("contribution_sessions", {"select": "status", "id": f"eq.{session_id}"})
-            if sessions and sessions[0]["status"] != "paid":
-                await sb_patch("contribution_sessions", {
-                    "status": "paid",
-                    "razorpay_payment_id": payment_id,
-                    "paid_at": datetime.now(timezone.utc).isoformat()
-                }, {"id": f"eq.{session_id}"})
-                await sb_patch("allocations", {"status": "paid"}, {"session_id": f"eq.{session_id}"})
+            await transition_session("paid", ("created", "pending", "failed"), session_id=session_id,
+                                     fields={"razorpay_payment_id": payment_id})
 
         from urllib.parse import quote
         redirect_url = f"/thank-you?session={session_id}&name={quote(donor_name)}&payment=success"
@@ -741,47 +2196,58 @@ async def payment_link_callback(request: Request):
 # ---- ADMIN ----
 @api_router.get("/admin/dashboard")
 async def admin_dashboard(admin=Depends(get_admin_token)):
-    allocs = await sb_get("allocations", {"select": "pot_id,amount_paise", "status": "eq.paid"})
-    total_collected = sum(a["amount_paise"] for a in allocs)
-    pot_totals = defaultdict(int)
-    for a in allocs:
-        pot_totals[a["pot_id"]] += a["amount_paise"]
+    results, errors = await sb_gather({
+        "totals": pot_totals.read(),
+        "pots": sb_get("pots", {"select": "id,title,slug,goal_amount_paise,is_active"}),
+        "recent": sb_get("contribution_sessions", {
+            "select": "id,donor_name,donor_email,total_amount_paise,fee_amount_paise,status,paid_at,created_at",
+            "status": "eq.paid", "order": "paid_at.desc.nullslast", "limit": "10"
+        }),
+    })
+    raised = {pid: row["raised_paise"] for pid, row in (results["totals"] or {}).items() if row["raised_paise"]}
+    total_collected = sum(raised.values())
+    pots = results["pots"] or []
+    recent = results["recent"] or []
 
-    pots = await sb_get("pots", {"select": "id,title,slug,goal_amount_paise,is_active"})
     pot_map = {p["id"]: p for p in pots}
     pot_stats = [{
         "pot_id": pid, "title": pot_map.get(pid, {}).get("title", "?"),
         "goal_amount_paise": pot_map.get(pid, {}).get("goal_amount_paise"),
         "total_raised_paise": total, "is_active": pot_map.get(pid, {}).get("is_active", False)
-    } for pid, total in pot_totals.items()]
-
-    recent = await sb_get("contribution_sessions", {
-        "select": "id,donor_name,donor_email,total_amount_paise,fee_amount_paise,status,paid_at,created_at",
-        "status": "eq.paid", "order": "paid_at.desc.nullslast", "limit": "10"
-    })
+    } for pid, total in raised.items()]
 
     return {
         "total_collected_paise": total_collected, "pot_stats": pot_stats,
         "recent_contributions": recent, "total_pots": len(pots),
-        "active_pots": sum(1 for p in pots if p.get("is_active"))
+        "active_pots": sum(1 for p in pots if p.get("is_active")),
+        "errors": errors
     }
 
 
+def _mark_partial(response, errors):
+    """List endpoints keep their array body; missing sections are named in a header."""
+    if errors:
+        response.headers["X-Partial-Results"] = ",".join(sorted(errors))
+
+
 @api_router.get("/admin/pots")
-async def admin_list_pots(admin=Depends(get_admin_token)):
-    pots = await sb_get("pots", {"select": "*", "order": "created_at.desc"})
-    all_items = await sb_get("pot_items", {"select": "*", "order": "sort_order.asc"})
+async def admin_list_pots(response: Response, admin=Depends(get_admin_token)):
+    results, errors = await sb_gather({
+        "pots": sb_get("pots", {"select": "*", "order": "created_at.desc"}, cache_ttl=0),
+        "items": sb_get("pot_items", {"select": "*", "order": "sort_order.asc"}, cache_ttl=0),
+        "totals": pot_totals.read(),
+    })
+    if "pots" in errors:
+        raise HTTPException(502, detail=errors["pots"])
+    _mark_partial(response, errors)
+    pots = results["pots"]
     items_by_pot = defaultdict(list)
-    for item in all_items:
+    for item in results["items"] or []:
         items_by_pot[item["pot_id"]].append(item)
 
-    allocs = await sb_get("allocations", {"select": "pot_id,amount_paise", "status": "eq.paid"})
-    pot_totals = defaultdict(int)
-    for a in allocs:
-        pot_totals[a["pot_id"]] += a["amount_paise"]
-
+    totals = results["totals"] or {}
     for pot in pots:
-        pot["total_raised_paise"] = pot_totals.get(pot["id"], 0)
+        pot["total_raised_paise"] = totals.get(pot["id"], {}).get("raised_paise", 0)
         pot["items"] = items_by_pot.get(pot["id"], [])
     return pots
 
@@ -800,6 +2266,7 @@ async def create_pot(request: Request, admin=Depends(get_admin_token)):
         "goal_amount_paise": data.get("goal_amount_paise"),
         "is_active": True
     })
+    public_cache.expire()
     return result[0]
 
 
@@ -811,12 +2278,14 @@ async def update_pot(pot_id: str, request: Request, admin=Depends(get_admin_toke
         if key in data:
             update[key] = data[key]
     result = await sb_patch("pots", update, {"id": f"eq.{pot_id}"})
+    public_cache.expire()
     return result[0] if result else {"status": "updated"}
 
 
 @api_router.post("/admin/pots/{pot_id}/archive")
 async def archive_pot(pot_id: str, admin=Depends(get_admin_token)):
     await sb_patch("pots", {"is_active": False}, {"id": f"eq.{pot_id}"})
+    public_cache.expire()
     return {"status": "archived"}
 
 
@@ -832,6 +2301,7 @@ async def add_pot_item(pot_id: str, request: Request, admin=Depends(get_admin_to
         "image_url": data.get("image_url", ""),
         "sort_order": data.get("sort_order", 0)
     })
+    public_cache.expire()
     return result[0]
 
 
@@ -843,12 +2313,14 @@ async def update_pot_item(item_id: str, request: Request, admin=Depends(get_admi
         if key in data:
             update[key] = data[key]
     result = await sb_patch("pot_items", update, {"id": f"eq.{item_id}"})
+    public_cache.expire()
     return result[0] if result else {"status": "updated"}
 
 
 @api_router.delete("/admin/pot-items/{item_id}")
 async def delete_pot_item(item_id: str, admin=Depends(get_admin_token)):
     await sb_delete("pot_items", {"id": f"eq.{item_id}"})
+    public_cache.expire()
     return {"status": "deleted"}
 
 
@@ -864,78 +2336,358 @@ async def update_contribution_status(session_id: str, request: Request, admin=De
     if not db_status:
         raise HTTPException(400, "Status must be 'received' or 'failed'")
 
-    sessions = await sb_get("contribution_sessions", {"select": "id,status", "id": f"eq.{session_id}"})
-    if not sessions:
+    result = await transition_session(db_status, [s for s in SESSION_STATES if s != db_status], session_id=session_id)
+    if not result["found"]:
         raise HTTPException(404, "Session not found")
 
-    await sb_patch("contribution_sessions", {"status": db_status}, {"id": f"eq.{session_id}"})
-    await sb_patch("allocations", {"status": db_status}, {"session_id": f"eq.{session_id}"})
-
     return {"status": db_status, "session_id": session_id}
 
 
 
-@api_router.get("/admin/contributions")
-async def admin_contributions(admin=Depends(get_admin_token)):
-    sessions = await sb_get("contribution_sessions", {"select": "*", "order": "created_at.desc"})
-    all_allocs = await sb_get("allocations", {"select": "*"})
-    allocs_by_session = defaultdict(list)
-    for a in all_allocs:
-        allocs_by_session[a["session_id"]].append(a)
+ADMIN_CONTRIBUTIONS_PAGE_SIZE = 50
+
+
+def _pgrst_quote(value):
+    """Quote a value for PostgREST's and=/or= syntax (commas, dots and parens are reserved there)."""
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _like_escape(value):
+    """Make %, _ and \\ match themselves in a LIKE pattern (PostgREST's * stays the wildcard)."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _encode_cursor(row, column="created_at"):
+    return base64.urlsafe_b64encode(f"{row[column]}|{row['id']}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor):
+    try:
+        at, session_id = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split("|")
+        at = datetime.fromisoformat(at)
+        if at.tzinfo is None:
+            at = at.replace(tzinfo=timezone.utc)
+        return at.isoformat(), str(uuid.UUID(session_id))
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(400, "Invalid cursor")
+
+
+def _parse_date_filter(value, name, end=False):
+    """ISO date or datetime, in ADMIN_TIMEZONE unless it carries its own offset.
+
+    A bare date closing a range (end=True) covers that whole day: it becomes
+    the next midnight, used as an exclusive bound.
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(400, f"{name} must be an ISO date or datetime")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=ADMIN_TIMEZONE)
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return parsed.isoformat()
+    return (parsed + timedelta(days=1) if end else parsed).isoformat()
+
+
+def _keyset_before(at, session_id, column="created_at"):
+    """PostgREST conditions for (column, id) < cursor, newest-first pages.
+
+    The redundant lte bound lets the index scan start at the cursor.
+    """
+    return [f"{column}.lte.{_pgrst_quote(at)}",
+            f"or({column}.lt.{_pgrst_quote(at)},"
+            f"and({column}.eq.{_pgrst_quote(at)},id.lt.{session_id}))"]
 
-    pots = await sb_get("pots", {"select": "id,title"})
-    pot_names = {p["id"]: p["title"] for p in pots}
+
+def _keyset_after(at, session_id, column="created_at"):
+    """PostgREST conditions for (column, id) > cursor."""
+    return [f"{column}.gte.{_pgrst_quote(at)}",
+            f"or({column}.gt.{_pgrst_quote(at)},"
+            f"and({column}.eq.{_pgrst_quote(at)},id.gt.{session_id}))"]
+
+
+async def _iter_session_pages(params, page_size, conditions=()):
+    """Yield newest-first pages of contribution_sessions by keyset until exhausted.
+
+    The next page is requested before the current one is handed over, so
+    the database round trip overlaps the caller's processing. Only an empty
+    page ends the walk: PostgREST's max-rows may cap a page below page_size,
+    so a short page doesn't mean the last one.
+    """
+    async def fetch(cursor_conditions):
+        page_conditions = [*conditions, *cursor_conditions]
+        page_params = {**params, "order": "created_at.desc,id.desc", "limit": str(page_size)}
+        if page_conditions:
+            page_params["and"] = f"({','.join(page_conditions)})"
+        return await sb_get("contribution_sessions", page_params, cache_ttl=0)
+
+    next_page = asyncio.create_task(fetch(()))
+    try:
+        while True:
+            page = await next_page
+            if not page:
+                return
+            next_page = asyncio.create_task(fetch(_keyset_before(page[-1]["created_at"], page[-1]["id"])))
+            yield page
+    finally:
+        if not next_page.done():
+            next_page.cancel()
+
+
+@api_router.get("/admin/contributions")
+async def admin_contributions(
+    response: Response,
+    cursor: str = Query(None),
+    limit: int = Query(ADMIN_CONTRIBUTIONS_PAGE_SIZE, ge=1, le=200),
+    status: str = Query(None),
+    pot_id: str = Query(None),
+    payment_method: str = Query(None),
+    created_from: str = Query(None),
+    created_to: str = Query(None),
+    q: str = Query(None),
+    admin=Depends(get_admin_token)
+):
+    """Newest-first contributions, one keyset page at a time, filtered in the database.
+
+    The next page's cursor (created_at, id of the last row) is in X-Next-Cursor.
+    """
+    params = {
+        "select": "*,allocations(*,pots(title))",
+        "order": "created_at.desc,id.desc",
+        "limit": str(limit + 1)
+    }
+    conditions = []
+    if cursor:
+        conditions.extend(_keyset_before(*_decode_cursor(cursor)))
+    if status:
+        if status not in SESSION_STATES:
+            raise HTTPException(400, f"status must be one of {', '.join(SESSION_STATES)}")
+        params["status"] = f"eq.{status}"
+    if payment_method:
+        if payment_method not in PAYMENT_METHODS:
+            raise HTTPException(400, f"payment_method must be one of {', '.join(PAYMENT_METHODS)}")
+        params["payment_method"] = f"eq.{payment_method}"
+    if pot_id:
+        try:
+            pot_id = str(uuid.UUID(pot_id))
+        except ValueError:
+            raise HTTPException(400, "Invalid pot_id")
+        # Inner-joined second embed filters sessions to the pot without trimming the allocations shown
+        params["select"] += ",in_pot:allocations!inner(pot_id)"
+        params["in_pot.pot_id"] = f"eq.{pot_id}"
+    if created_from:
+        conditions.append(f"created_at.gte.{_pgrst_quote(_parse_date_filter(created_from, 'created_from'))}")
+    if created_to:
+        conditions.append(f"created_at.lt.{_pgrst_quote(_parse_date_filter(created_to, 'created_to', end=True))}")
+    if q and q.strip():
+        prefix = _like_escape(q.strip().replace("*", ""))
+        conditions.append(f"or(donor_name.ilike.{_pgrst_quote(prefix + '*')},donor_phone.like.{_pgrst_quote(prefix + '*')})")
+    if conditions:
+        params["and"] = f"({','.join(conditions)})"
+
+    sessions = await sb_get("contribution_sessions", params, cache_ttl=0)
+    if len(sessions) > limit:
+        sessions = sessions[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(sessions[-1])
 
     for session in sessions:
-        sa = allocs_by_session.get(session["id"], [])
-        for alloc in sa:
-            alloc["pot_title"] = pot_names.get(alloc["pot_id"], "Unknown")
-        session["allocations"] = sa
+        session.pop("in_pot", None)
+        for alloc in session["allocations"]:
+            alloc["pot_title"] = (alloc.pop("pots", None) or {}).get("title", "Unknown")
     return sessions
 
 
+EXPORT_PAGE_SIZE = int(os.environ.get('EXPORT_PAGE_SIZE', '1000'))
+EXPORT_PARQUET_ROW_GROUP = 65536
+
+
+def _export_session_filter(status):
+    if status == "all":
+        return {}
+    if status not in SESSION_STATES:
+        raise HTTPException(400, f"status must be 'all' or one of {', '.join(SESSION_STATES)}")
+    return {"status": f"eq.{status}"}
+
+
 @api_router.get("/admin/contributions/export")
-async def export_contributions(admin=Depends(get_admin_token)):
-    sessions = await sb_get("contribution_sessions", {
-        "select": "*", "status": "eq.paid", "order": "paid_at.desc.nullslast"
-    })
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["Donor Name", "Email", "Phone", "Message", "Amount (INR)", "Fee (INR)", "Status", "Paid At", "Payment ID"])
+async def export_contributions(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|parquet|arrow)$"),
+    status: str = Query("paid", description="Session status to export, or 'all'"),
+    breakdown: bool = Query(False, description="CSV only: add one amount column per pot"),
+    admin=Depends(get_admin_token)
+):
+    """Contributions streamed page by page (memory stays flat however many guests).
+
+    csv: one row per session, gzip-encoded when the client accepts it.
+    parquet / arrow: typed, one row per allocation with its session and pot title.
+    """
+    filters = _export_session_filter(status)
+    if format != "csv":
+        return await _export_columnar(format, filters)
+
+    pots = await sb_get("pots", {"select": "id,title", "order": "created_at.asc"}) if breakdown else []
+    select = "*,allocations(pot_id,amount_paise)" if breakdown else "*"
+    pages = _iter_session_pages({"select": select, **filters}, EXPORT_PAGE_SIZE)
+    async def rows():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["Donor Name", "Email", "Phone", "Message", "Amount (INR)", "Fee (INR)", "Status", "Paid At",
+                         "Payment ID", *(f"{p['title']} (INR)" for p in pots)])
+        async for page in pages:
+            for s in page:
+                by_pot = Counter()
+                for a in s.get("allocations") or ():
+                    by_pot[a["pot_id"]] += a["amount_paise"]
+                writer.writerow([
+                    s["donor_name"], s.get("donor_email", ""), s.get("donor_phone", ""),
+                    s.get("donor_message", ""), s["total_amount_paise"] / 100,
+                    s.get("fee_amount_paise", 0) / 100,
+                    s.get("status", ""), s.get("paid_at", ""),
+                    s.get("razorpay_payment_id", ""),
+                    *(by_pot[p["id"]] / 100 for p in pots)
+                ])
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    async def gzipped(chunks):
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+        async for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+
+    headers = {"Content-Disposition": "attachment; filename=contributions.csv"}
+    body = rows()
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+        body = gzipped(body)
+    return StreamingResponse(body, media_type="text/csv", headers=headers)
+
+
+
+def _columnar_export_schema():
+    utc = pa.timestamp("us", tz="UTC")
+    return pa.schema([
+        ("session_id", pa.string()), ("status", pa.string()), ("payment_method", pa.string()),
+        ("donor_name", pa.string()), ("donor_email", pa.string()), ("donor_phone", pa.string()),
+        ("donor_message", pa.string()), ("session_total_paise", pa.int64()), ("fee_amount_paise", pa.int64()),
+        ("created_at", utc), ("submitted_at", utc), ("paid_at", utc),
+        ("razorpay_order_id", pa.string()), ("razorpay_payment_id", pa.string()), ("utr", pa.string()),
+        ("allocation_id", pa.string()), ("allocation_status", pa.string()), ("pot_id", pa.string()),
+        ("pot_title", pa.string()), ("pot_item_id", pa.string()), ("amount_paise", pa.int64()),
+    ])
+
+
+def _parse_timestamp(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+def _allocation_record_batch(schema, sessions):
+    """One page of sessions as an Arrow batch: a row per allocation (a session without any keeps one row)."""
+    columns = {name: [] for name in schema.names}
     for s in sessions:
-        writer.writerow([
-            s["donor_name"], s.get("donor_email", ""), s.get("donor_phone", ""),
-            s.get("donor_message", ""), s["total_amount_paise"] / 100,
-            s.get("fee_amount_paise", 0) / 100,
-            s.get("status", ""), s.get("paid_at", ""),
-            s.get("razorpay_payment_id", "")
-        ])
-    output.seek(0)
-    return StreamingResponse(
-        iter([output.getvalue()]), media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=contributions.csv"}
-    )
+        session = [
+            s["id"], s.get("status"), s.get("payment_method"), s.get("donor_name"), s.get("donor_email"),
+            s.get("donor_phone"), s.get("donor_message"), s.get("total_amount_paise"), s.get("fee_amount_paise"),
+            _parse_timestamp(s.get("created_at")), _parse_timestamp(s.get("submitted_at")),
+            _parse_timestamp(s.get("paid_at")), s.get("razorpay_order_id"), s.get("razorpay_payment_id"), s.get("utr")
+        ]
+        for a in s.get("allocations") or [{}]:
+            allocation = [a.get("id"), a.get("status"), a.get("pot_id"), (a.get("pots") or {}).get("title"),
+                          a.get("pot_item_id"), a.get("amount_paise")]
+            for name, value in zip(schema.names, session + allocation):
+                columns[name].append(value)
+    return pa.RecordBatch.from_pydict(columns, schema=schema)
+
+
+class _ChunkSink:
+    """Write-only file object for pyarrow writers; the stream drains what they wrote."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+async def _export_columnar(format, filters):
+    if pa is None:
+        raise HTTPException(501, "Parquet/Arrow export needs pyarrow installed on the server")
+    schema = _columnar_export_schema()
+    pages = _iter_session_pages({
+        "select": "*,allocations(id,status,pot_id,pot_item_id,amount_paise,pots(title))", **filters
+    }, EXPORT_PAGE_SIZE)
+
+    async def stream():
+        sink = _ChunkSink()
+        if format == "parquet":
+            writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema, compression="zstd")
+        else:
+            writer = pa.ipc.new_file(pa.PythonFile(sink, mode="w"), schema)
+        pending, pending_rows = [], 0
+        async for page in pages:
+            batch = _allocation_record_batch(schema, page)
+            if format == "parquet":
+                # Row groups of a useful size rather than one per page
+                pending.append(batch)
+                pending_rows += batch.num_rows
+                if pending_rows >= EXPORT_PARQUET_ROW_GROUP:
+                    writer.write_table(pa.Table.from_batches(pending, schema))
+                    pending, pending_rows = [], 0
+            else:
+                writer.write_batch(batch)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+        if pending:
+            writer.write_table(pa.Table.from_batches(pending, schema))
+        writer.close()
+        yield sink.drain()
+
+    extension, media_type = {
+        "parquet": ("parquet", "application/vnd.apache.parquet"),
+        "arrow": ("arrow", "application/vnd.apache.arrow.file"),
+    }[format]
+    return StreamingResponse(stream(), media_type=media_type, headers={
+        "Content-Disposition": f"attachment; filename=contributions.{extension}"
+    })
 
 
 
 # ---- ADMIN SETTINGS ----
 @api_router.get("/admin/settings")
 async def get_admin_settings(admin=Depends(get_admin_token)):
-    """Get all site settings."""
-    try:
-        settings = await sb_get("site_settings", {"select": "*"})
-        # Convert to dict for easier access
-        settings_dict = {s["setting_key"]: s["setting_value"] for s in settings}
-        return {
-            "upi_id": settings_dict.get("upi_id", DEFAULT_UPI_ID),
-            "upi_name": settings_dict.get("upi_name", "Shvetha & Aadi Wedding Gift")
-        }
-    except Exception:
-        # Table might not exist, return defaults
-        return {
-            "upi_id": DEFAULT_UPI_ID,
-            "upi_name": "Shvetha & Aadi Wedding Gift"
-        }
+    """Get all site settings (uncached: another worker may have saved them)."""
+    values = await site_settings.read(("upi_id", "upi_name"))
+    return {
+        "upi_id": values.get("upi_id") or DEFAULT_UPI_ID,
+        "upi_name": values.get("upi_name") or DEFAULT_UPI_NAME
+    }
 
 
 @api_router.put("/admin/settings")
@@ -949,25 +2701,16 @@ async def update_admin_settings(request: Request, admin=Depends(get_admin_token)
         raise HTTPException(400, "Invalid UPI ID format. Must contain @")
     
     upi_name = data.get("upi_name", "").strip()
-    
-    results = {}
-    
-    # Try to upsert settings - create table if it doesn't exist
-    for key, value in [("upi_id", upi_id), ("upi_name", upi_name)]:
-        if value:
-            try:
-                # Try to update existing
-                existing = await sb_get("site_settings", {"select": "id", "setting_key": f"eq.{key}"})
-                if existing:
-                    await sb_patch("site_settings", {"setting_value": value}, {"setting_key": f"eq.{key}"})
-                else:
-                    await sb_post("site_settings", {"setting_key": key, "setting_value": value})
-                results[key] = value
-            except Exception as e:
-                logger.warning(f"Could not save setting {key}: {e}")
-                # If table doesn't exist, we'll just return defaults
-                results[key] = value if key == "upi_id" else DEFAULT_UPI_ID
-    
+
+    changes = {key: value for key, value in [("upi_id", upi_id), ("upi_name", upi_name)] if value}
+    if not changes:
+        return {"status": "updated", "settings": {}}
+    try:
+        results = await site_settings.update(changes)
+    except HTTPException as e:
+        logger.warning(f"Could not save settings {list(changes)}: {e.detail}")
+        raise HTTPException(502, "Could not save settings")
+
     return {"status": "updated", "settings": results}
 
 
@@ -985,4 +2728,5 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Partial-Results", "X-Next-Cursor"],
 )
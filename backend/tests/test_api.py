@@ -5,6 +5,7 @@ Tests all API endpoints including admin authentication with updated credentials
 import pytest
 import requests
 import os
+from datetime import datetime, timedelta, timezone
 
 BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
 
@@ -88,6 +89,41 @@ class TestPublicPots:
         assert isinstance(contributors, list)
         print(f"SUCCESS: Kitchen pot has {len(contributors)} contributors")
 
+    def test_list_pots_conditional_get(self):
+        """Repeating /api/pots with its ETag returns 304 without a body"""
+        response = requests.get(f"{BASE_URL}/api/pots")
+        assert response.status_code == 200
+        etag = response.headers.get("ETag")
+        assert etag
+        assert "no-cache" in response.headers.get("Cache-Control", "")
+
+        revalidated = requests.get(f"{BASE_URL}/api/pots", headers={"If-None-Match": etag})
+        if revalidated.status_code == 200:
+            # Data changed in between (a payment landed); the new ETag must differ
+            assert revalidated.headers.get("ETag") != etag
+        else:
+            assert revalidated.status_code == 304
+            assert revalidated.content == b""
+        print(f"SUCCESS: Conditional GET returned {revalidated.status_code}")
+
+    def test_blessings_feed_pages_and_since(self):
+        """Blessings feed pages by cursor without overlap; since the latest cursor returns only newer wishes"""
+        first = requests.get(f"{BASE_URL}/api/blessings", params={"limit": 5})
+        assert first.status_code == 200
+        page = first.json()
+        assert len(page["items"]) <= 5
+        assert page["total"] >= len(page["items"])
+        if page["next_cursor"]:
+            older = requests.get(f"{BASE_URL}/api/blessings", params={"limit": 5, "cursor": page["next_cursor"]}).json()
+            assert not {w["id"] for w in older["items"]} & {w["id"] for w in page["items"]}
+        if page["latest_cursor"]:
+            delta = requests.get(f"{BASE_URL}/api/blessings", params={"since": page["latest_cursor"]}).json()
+            assert not {w["id"] for w in delta["items"]} & {w["id"] for w in page["items"]}
+            assert delta["reset"] is False
+        invalid = requests.get(f"{BASE_URL}/api/blessings", params={"since": "not-a-cursor"})
+        assert invalid.status_code == 400
+        print(f"SUCCESS: Blessings feed has {page['total']} wishes")
+
 
 class TestAdminAuthentication:
     """Admin authentication tests with updated credentials"""
@@ -158,6 +194,7 @@ class TestAdminEndpoints:
         assert "total_collected_paise" in data
         assert "pot_stats" in data
         assert "recent_contributions" in data
+        assert data["errors"] == {}
         print(f"SUCCESS: Dashboard - Total collected: {data['total_collected_paise']} paise")
     
     def test_admin_pots_list(self, admin_token):
@@ -181,6 +218,102 @@ class TestAdminEndpoints:
         contributions = response.json()
         assert isinstance(contributions, list)
         print(f"SUCCESS: Admin contributions list has {len(contributions)} entries")
+
+    def test_admin_contributions_keyset_pages(self, admin_token):
+        """Pages follow X-Next-Cursor without overlap, newest first"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        first = requests.get(f"{BASE_URL}/api/admin/contributions", params={"limit": 2}, headers=headers)
+        assert first.status_code == 200
+        page1 = first.json()
+        assert len(page1) <= 2
+        cursor = first.headers.get("X-Next-Cursor")
+        if not cursor:
+            pytest.skip("Fewer than 3 contributions, nothing to page through")
+
+        second = requests.get(f"{BASE_URL}/api/admin/contributions",
+                              params={"limit": 2, "cursor": cursor}, headers=headers)
+        assert second.status_code == 200
+        page2 = second.json()
+        assert not {c["id"] for c in page1} & {c["id"] for c in page2}
+        assert page1[-1]["created_at"] >= page2[0]["created_at"]
+        print(f"SUCCESS: Paged {len(page1)} + {len(page2)} contributions by cursor")
+
+    def test_admin_contributions_filters(self, admin_token):
+        """Status filter is applied server-side; bad filters are rejected"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        response = requests.get(f"{BASE_URL}/api/admin/contributions", params={"status": "paid"}, headers=headers)
+        assert response.status_code == 200
+        assert all(c["status"] == "paid" for c in response.json())
+        for params in ({"status": "bogus"}, {"cursor": "not-a-cursor"}, {"pot_id": "x"}, {"payment_method": "cash"}):
+            bad = requests.get(f"{BASE_URL}/api/admin/contributions", params=params, headers=headers)
+            assert bad.status_code == 400
+        # % and _ in a search are literal characters, not wildcards
+        for q in ("_", "%"):
+            response = requests.get(f"{BASE_URL}/api/admin/contributions", params={"q": q}, headers=headers)
+            assert response.status_code == 200
+            assert all(c["donor_name"].lower().startswith(q) or c["donor_phone"].startswith(q) for c in response.json())
+        print("SUCCESS: Contribution filters validated and applied")
+
+    def test_admin_contributions_same_day_range(self, admin_token):
+        """Picking the same from/to day (IST) includes contributions made on that day"""
+        pots = requests.get(f"{BASE_URL}/api/pots").json()
+        create = requests.post(f"{BASE_URL}/api/upi/session/create", json={
+            "allocations": [{"pot_id": pots[0]["id"], "amount_paise": 10000}]
+        })
+        assert create.status_code == 200
+        session_id = create.json()["session_id"]
+
+        today = datetime.now(timezone(timedelta(hours=5, minutes=30))).date().isoformat()
+        response = requests.get(f"{BASE_URL}/api/admin/contributions",
+                                params={"created_from": today, "created_to": today},
+                                headers={"Authorization": f"Bearer {admin_token}"})
+        assert response.status_code == 200
+        assert session_id in [c["id"] for c in response.json()]
+        print(f"SUCCESS: Same-day range {today} includes today's contribution")
+
+    def test_upi_session_uses_saved_upi_id(self, admin_token):
+        """A UPI session carries the payee saved in settings, not a cached copy"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        settings = requests.get(f"{BASE_URL}/api/admin/settings", headers=headers).json()
+        saved = requests.put(f"{BASE_URL}/api/admin/settings", headers=headers, json=settings)
+        assert saved.status_code == 200
+
+        pots = requests.get(f"{BASE_URL}/api/pots").json()
+        create = requests.post(f"{BASE_URL}/api/upi/session/create", json={
+            "allocations": [{"pot_id": pots[0]["id"], "amount_paise": 10000}]
+        })
+        assert create.status_code == 200
+        assert create.json()["upi_id"] == settings["upi_id"]
+        assert create.json()["upi_name"] == settings["upi_name"]
+        print(f"SUCCESS: UPI session pays {create.json()['upi_id']}")
+
+    def test_export_contributions_csv(self, admin_token):
+        """CSV export streams a header row, with per-pot columns on request"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        plain = requests.get(f"{BASE_URL}/api/admin/contributions/export", headers=headers)
+        assert plain.status_code == 200
+        assert plain.headers["content-type"].startswith("text/csv")
+        header = plain.text.splitlines()[0].split(",")
+        assert header[0] == "Donor Name"
+
+        detailed = requests.get(f"{BASE_URL}/api/admin/contributions/export",
+                                params={"breakdown": "true"}, headers=headers)
+        assert detailed.status_code == 200
+        detailed_header = detailed.text.splitlines()[0].split(",")
+        assert detailed_header[:len(header)] == header
+        assert all(col.endswith("(INR)") for col in detailed_header[len(header):])
+        print(f"SUCCESS: Export has {len(detailed_header) - len(header)} per-pot columns")
+
+    def test_export_contributions_parquet(self, admin_token):
+        """Parquet export is a Parquet file (or 501 where pyarrow isn't installed)"""
+        response = requests.get(f"{BASE_URL}/api/admin/contributions/export",
+                                params={"format": "parquet", "status": "all"},
+                                headers={"Authorization": f"Bearer {admin_token}"})
+        if response.status_code == 501:
+            pytest.skip("pyarrow not installed on the server")
+        assert response.status_code == 200
+        assert response.content[:4] == b"PAR1" and response.content[-4:] == b"PAR1"
+        print(f"SUCCESS: Parquet export is {len(response.content)} bytes")
     
     def test_admin_endpoint_without_auth(self):
         """Test admin endpoints require authentication"""
@@ -277,6 +277,40 @@ class TestDataFreshness:
             f"List not showing fresh data: expected {expected}, got {new_total}"
         print(f"✓ /api/pots returns fresh data after contribution")
     
+    def test_read_pay_read_is_fresh_without_waiting(self):
+        """A read cached just before a payment is not served after it: pot detail and blessings update at once"""
+        pots = requests.get(f"{BASE_URL}/api/pots").json()
+        if not pots:
+            pytest.skip("No pots available")
+        pot = pots[0]
+        # Prime the response caches
+        initial_total = requests.get(f"{BASE_URL}/api/pots/{pot['slug']}").json()["total_raised_paise"]
+        requests.get(f"{BASE_URL}/api/blessings")
+        test_amount = 4000  # ₹40
+
+        create_resp = requests.post(f"{BASE_URL}/api/upi/session/create", json={
+            "allocations": [{"pot_id": pot["id"], "amount_paise": test_amount}]
+        })
+        session_id = create_resp.json()["session_id"]
+        unique_id = str(uuid.uuid4())[:8]
+        confirm = requests.post(f"{BASE_URL}/api/upi/blessing/confirm", json={
+            "session_id": session_id,
+            "donor_name": f"Read Pay Read {unique_id}",
+            "donor_phone": "+919876543210",
+            "donor_email": f"rpr{unique_id}@test.com",
+            "donor_message": "Testing read-pay-read"
+        })
+        assert confirm.status_code == 200
+
+        # No sleep: the confirm response means the caches have already let go of the old data
+        detail = requests.get(f"{BASE_URL}/api/pots/{pot['slug']}").json()
+        assert detail["total_raised_paise"] == initial_total + test_amount
+        listed = next(p for p in requests.get(f"{BASE_URL}/api/pots").json() if p["id"] == pot["id"])
+        assert listed["total_raised_paise"] == initial_total + test_amount
+        blessings = requests.get(f"{BASE_URL}/api/blessings").json()["items"]
+        assert any(b["id"] == session_id for b in blessings), "Guest's own blessing missing right after paying"
+        print(f"✓ Read-pay-read returned the new total and the guest's blessing immediately")
+
     def test_multiple_pots_no_cross_contamination(self):
         """Verify contribution to one pot doesn't affect others"""
         response = requests.get(f"{BASE_URL}/api/pots")
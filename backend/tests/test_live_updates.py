@@ -0,0 +1,161 @@
+"""
+Test live update endpoints for Wedding Gift Registry.
+
+Focus areas:
+1. /api/pots/stream sends a snapshot of pot progress on connect
+2. /api/pots/stream resumes from an unknown Last-Event-ID with a fresh snapshot
+3. /api/session/{id}/wait falls back to the current status at timeout, and wakes on payment
+4. /api/live WebSocket sends a snapshot of pots and recent blessings on connect
+"""
+
+import pytest
+import requests
+import os
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from websockets.sync.client import connect
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+def read_sse_event(response):
+    """Read the first event (skipping retry/comment lines) from an SSE response."""
+    event = {}
+    for line in response.iter_lines(decode_unicode=True):
+        if line == "":
+            if "data" in event:
+                return event
+            continue
+        if line.startswith(":") or line.startswith("retry:"):
+            continue
+        field, _, value = line.partition(": ")
+        event[field] = value
+    return event
+
+
+class TestPotsStream:
+    """Test /api/pots/stream Server-Sent Events feed"""
+
+    def test_stream_sends_snapshot_on_connect(self):
+        """First event is a snapshot matching /api/pots totals"""
+        pots = requests.get(f"{BASE_URL}/api/pots").json()
+        with requests.get(f"{BASE_URL}/api/pots/stream", stream=True, timeout=10) as response:
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/event-stream")
+            event = read_sse_event(response)
+
+        assert event["event"] == "snapshot"
+        assert "id" in event
+        snapshot = json.loads(event["data"])
+        for pot in pots:
+            if pot["id"] in snapshot:
+                assert snapshot[pot["id"]]["total_raised_paise"] == pot["total_raised_paise"]
+                assert snapshot[pot["id"]]["contributor_count"] == pot["contributor_count"]
+        print(f"SUCCESS: Snapshot covers {len(snapshot)} pots")
+
+    def test_stream_unknown_last_event_id_gets_snapshot(self):
+        """A Last-Event-ID the server can't replay falls back to a snapshot"""
+        headers = {"Last-Event-ID": "999999999"}
+        with requests.get(f"{BASE_URL}/api/pots/stream", headers=headers, stream=True, timeout=10) as response:
+            assert response.status_code == 200
+            event = read_sse_event(response)
+        assert event["event"] == "snapshot"
+        print("SUCCESS: Unknown Last-Event-ID resumed with snapshot")
+
+
+class TestSessionWait:
+    """Test /api/session/{id}/wait long-poll"""
+
+    def test_wait_times_out_with_current_status(self):
+        """An unpaid session returns its current status once the timeout elapses"""
+        pots = requests.get(f"{BASE_URL}/api/pots").json()
+        assert len(pots) > 0
+        create = requests.post(f"{BASE_URL}/api/upi/session/create", json={
+            "allocations": [{"pot_id": pots[0]["id"], "amount_paise": 10000}]
+        })
+        assert create.status_code == 200
+        session_id = create.json()["session_id"]
+
+        start = time.time()
+        response = requests.get(f"{BASE_URL}/api/session/{session_id}/wait", params={"timeout": 1})
+        elapsed = time.time() - start
+        assert response.status_code == 200
+        data = response.json()
+        assert data["id"] == session_id
+        assert data["status"] == "created"
+        assert elapsed >= 1
+        print(f"SUCCESS: Long-poll returned status '{data['status']}' after {elapsed:.1f}s")
+
+    def create_upi_session(self):
+        pots = requests.get(f"{BASE_URL}/api/pots").json()
+        create = requests.post(f"{BASE_URL}/api/upi/session/create", json={
+            "allocations": [{"pot_id": pots[0]["id"], "amount_paise": 10000}]
+        })
+        assert create.status_code == 200
+        return create.json()["session_id"]
+
+    def confirm(self, session_id):
+        unique_id = uuid.uuid4().hex[:8]
+        response = requests.post(f"{BASE_URL}/api/upi/blessing/confirm", json={
+            "session_id": session_id,
+            "donor_name": f"Wait Test {unique_id}",
+            "donor_phone": "+919876543210",
+            "donor_email": f"wait{unique_id}@example.com",
+            "donor_message": "Testing long-poll wake up"
+        })
+        assert response.status_code == 200, response.text
+
+    def test_wait_wakes_when_session_is_paid(self):
+        """A parked long-poll returns 'paid' as soon as the payment is confirmed, not at timeout"""
+        session_id = self.create_upi_session()
+        with ThreadPoolExecutor(1) as pool:
+            start = time.time()
+            waiting = pool.submit(requests.get, f"{BASE_URL}/api/session/{session_id}/wait",
+                                  params={"timeout": 20, "status": "created"}, timeout=30)
+            time.sleep(1)
+            self.confirm(session_id)
+            response = waiting.result()
+            elapsed = time.time() - start
+        assert response.status_code == 200
+        assert response.json()["status"] == "paid"
+        assert elapsed < 10
+        print(f"SUCCESS: Waiter woken with 'paid' after {elapsed:.1f}s")
+
+    def test_wait_returns_at_once_if_already_moved_on(self):
+        """A session paid before the long-poll starts is returned immediately"""
+        session_id = self.create_upi_session()
+        self.confirm(session_id)
+        start = time.time()
+        response = requests.get(f"{BASE_URL}/api/session/{session_id}/wait", params={"timeout": 20, "status": "created"})
+        elapsed = time.time() - start
+        assert response.status_code == 200
+        assert response.json()["status"] == "paid"
+        assert elapsed < 5
+        print(f"SUCCESS: Already-paid session returned after {elapsed:.1f}s")
+
+    def test_wait_rejects_out_of_range_timeout(self):
+        """timeout is bounded to keep connections from piling up"""
+        response = requests.get(f"{BASE_URL}/api/session/00000000-0000-0000-0000-000000000000/wait", params={"timeout": 600})
+        assert response.status_code == 422
+        print("SUCCESS: Out-of-range timeout rejected")
+
+
+class TestLiveSocket:
+    """Test /api/live WebSocket broadcast"""
+
+    def test_live_sends_snapshot_on_connect(self):
+        """First message is a snapshot matching /api/pots totals"""
+        pots = requests.get(f"{BASE_URL}/api/pots").json()
+        live_url = BASE_URL.replace("http", "ws", 1) + "/api/live"
+        with connect(live_url, open_timeout=10) as ws:
+            message = json.loads(ws.recv(timeout=10))
+
+        assert message["type"] == "snapshot"
+        assert isinstance(message["data"]["blessings"], list)
+        snapshot = message["data"]["pots"]
+        for pot in pots:
+            if pot["id"] in snapshot:
+                assert snapshot[pot["id"]]["total_raised_paise"] == pot["total_raised_paise"]
+        print(f"SUCCESS: Live snapshot covers {len(snapshot)} pots and {len(message['data']['blessings'])} blessings")
@@ -0,0 +1,174 @@
+"""
+Test the durable Razorpay webhook queue (runs in-process, no server needed).
+
+Focus areas:
+1. A redelivered gateway event id is accepted once and applied once
+2. An event that keeps failing retries with backoff, then goes dead; a redelivery revives it
+3. The worker survives SQLite errors and still applies the queued event
+4. Startup recovery only takes back batches whose claim lease has run out
+5. A slow batch keeps its lease; an expired claim counts as an attempt and ends up dead
+"""
+
+import asyncio
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("SUPABASE_URL", "http://postgrest.test")
+
+import server  # noqa: E402
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    applied = []
+
+    async def record(table, rows, on_conflict, ignore_duplicates=False):
+        return rows
+
+    async def apply(payload):
+        applied.append(payload["id"])
+
+    monkeypatch.setattr(server, "sb_upsert", record)
+    monkeypatch.setattr(server, "_apply_webhook_event", apply)
+    monkeypatch.setattr(server, "WEBHOOK_RETRY_BASE_SECONDS", 0)
+    q = server.WebhookQueue(str(tmp_path / "webhooks.sqlite3"))
+    q.applied = applied
+    return q
+
+
+def state_of(q, event_id):
+    return q._run("SELECT state, attempts FROM webhook_queue WHERE gateway_event_id = ?", (event_id,))[0]
+
+
+async def run_until(q, condition, timeout=5):
+    worker = asyncio.create_task(q.run())
+    try:
+        deadline = time.monotonic() + timeout
+        while not condition():
+            assert time.monotonic() < deadline, "queue worker did not get there in time"
+            await asyncio.sleep(0.01)
+    finally:
+        worker.cancel()
+
+
+class TestWebhookQueue:
+    """Test WebhookQueue append/claim/finish"""
+
+    def test_redelivery_is_deduped(self, queue):
+        """The same gateway event id is queued and applied only once"""
+        async def scenario():
+            assert await queue.append("evt_1", "payment.captured", '{"id": "evt_1"}')
+            assert not await queue.append("evt_1", "payment.captured", '{"id": "evt_1"}')
+            await run_until(queue, lambda: state_of(queue, "evt_1")[0] == "done")
+            assert not await queue.append("evt_1", "payment.captured", '{"id": "evt_1"}')
+        asyncio.run(scenario())
+        assert queue.applied == ["evt_1"]
+        assert state_of(queue, "evt_1")[0] == "done"
+        print("SUCCESS: Redelivered event applied once")
+
+    def test_failing_event_retries_then_dies(self, queue, monkeypatch):
+        """Each failure counts an attempt; the last one marks the event dead and a redelivery revives it"""
+        monkeypatch.setattr(server, "WEBHOOK_MAX_ATTEMPTS", 3)
+
+        async def fail(payload):
+            raise RuntimeError("upstream down")
+        monkeypatch.setattr(server, "_apply_webhook_event", fail)
+
+        async def scenario():
+            await queue.append("evt_2", "payment.captured", '{"id": "evt_2"}')
+            await run_until(queue, lambda: state_of(queue, "evt_2")[0] == "dead")
+            assert state_of(queue, "evt_2") == ("dead", 3)
+            assert await queue.append("evt_2", "payment.captured", '{"id": "evt_2"}')
+        asyncio.run(scenario())
+        assert state_of(queue, "evt_2") == ("pending", 0)
+        print("SUCCESS: Event went dead after 3 attempts and was revived by a redelivery")
+
+    def test_worker_survives_sqlite_errors(self, queue, monkeypatch):
+        """A locked database in claim or finish is retried; the event is still applied"""
+        monkeypatch.setattr(server, "WEBHOOK_LEASE_SECONDS", 0)  # let the failed batch be claimed again at once
+        claim, finish = queue._claim, queue._finish
+        failures = {"claim": 1, "finish": 1}
+
+        def flaky_claim(limit):
+            if failures["claim"]:
+                failures["claim"] -= 1
+                raise sqlite3.OperationalError("database is locked")
+            return claim(limit)
+
+        def flaky_finish(done, failed):
+            if failures["finish"]:
+                failures["finish"] -= 1
+                raise sqlite3.OperationalError("database is locked")
+            return finish(done, failed)
+        monkeypatch.setattr(queue, "_claim", flaky_claim)
+        monkeypatch.setattr(queue, "_finish", flaky_finish)
+
+        async def scenario():
+            await queue.append("evt_3", "payment.captured", '{"id": "evt_3"}')
+            await run_until(queue, lambda: state_of(queue, "evt_3")[0] == "done", timeout=10)
+        asyncio.run(scenario())
+        assert "evt_3" in queue.applied
+        print("SUCCESS: Worker kept going after SQLite errors")
+
+    def test_finish_rolls_back_on_error(self, queue):
+        """A failed finish leaves the shared connection out of any transaction"""
+        asyncio.run(queue.append("evt_4", "payment.captured", '{"id": "evt_4"}'))
+        rows = queue._claim(10)
+        with pytest.raises(sqlite3.ProgrammingError):
+            queue._finish([rows[0][0]], [(rows[0][0], "evt_4", 0, object())])  # unbindable error value
+        assert not queue.db.in_transaction
+        assert queue._finish([rows[0][0]], []) == []
+        assert state_of(queue, "evt_4")[0] == "done"
+        print("SUCCESS: Connection usable after a failed finish")
+
+    def test_recover_keeps_live_claims(self, queue, tmp_path):
+        """Another worker starting up leaves a batch with an unexpired lease alone"""
+        asyncio.run(queue.append("evt_5", "payment.captured", '{"id": "evt_5"}'))
+        assert queue._claim(10)
+        other = server.WebhookQueue(str(tmp_path / "webhooks.sqlite3"))
+        other.recover()
+        assert state_of(queue, "evt_5")[0] == "processing"
+        assert other._claim(10) == []
+        queue._run("UPDATE webhook_queue SET lease_until = 0")
+        other.recover()
+        assert state_of(queue, "evt_5")[0] == "pending"
+        print("SUCCESS: Recovery only took back the expired claim")
+
+    def test_slow_batch_renews_its_lease(self, queue, monkeypatch, tmp_path):
+        """A batch that runs past the lease isn't taken over by another worker"""
+        monkeypatch.setattr(server, "WEBHOOK_LEASE_SECONDS", 0.3)
+        other = server.WebhookQueue(str(tmp_path / "webhooks.sqlite3"))
+        stolen = []
+
+        async def slow(payload):
+            await asyncio.sleep(1)
+            stolen.extend(other._expire_leases() + other._claim(10))
+            queue.applied.append(payload["id"])
+        monkeypatch.setattr(server, "_apply_webhook_event", slow)
+
+        async def scenario():
+            await queue.append("evt_6", "payment.captured", '{"id": "evt_6"}')
+            await run_until(queue, lambda: state_of(queue, "evt_6")[0] == "done")
+        asyncio.run(scenario())
+        assert stolen == []
+        assert state_of(queue, "evt_6") == ("done", 0)
+        print("SUCCESS: Lease renewed while the batch ran")
+
+    def test_expired_claims_count_as_attempts(self, queue, monkeypatch):
+        """An event whose worker keeps dying goes dead after WEBHOOK_MAX_ATTEMPTS claims"""
+        monkeypatch.setattr(server, "WEBHOOK_MAX_ATTEMPTS", 3)
+        asyncio.run(queue.append("evt_7", "payment.captured", '{"id": "evt_7"}'))
+        for attempt in range(1, 4):
+            assert queue._claim(10)
+            queue._run("UPDATE webhook_queue SET lease_until = 0")  # the worker died mid-batch
+            dead = queue._expire_leases()
+            assert state_of(queue, "evt_7") == ("dead" if attempt == 3 else "pending", attempt)
+        assert dead == ["evt_7"]
+        assert queue._claim(10) == []
+        print("SUCCESS: Event went dead after 3 lost claims")
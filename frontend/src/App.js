@@ -8,6 +8,7 @@ import StoryPage from "./pages/StoryPage";
 import RitualsPage from "./pages/RitualsPage";
 import CelebrationPage from "./pages/CelebrationPage";
 import BlessingsPage from "./pages/BlessingsPage";
+import LiveWallPage from "./pages/LiveWallPage";
 import PotPage from "./pages/PotPage";
 import ThankYou from "./pages/ThankYou";
 import AdminLogin from "./pages/AdminLogin";
@@ -76,6 +77,7 @@ function App() {
               <Route path="/rituals" element={<RitualsPage />} />
               <Route path="/celebration" element={<CelebrationPage />} />
               <Route path="/blessings" element={<BlessingsPage />} />
+              <Route path="/live" element={<LiveWallPage />} />
               <Route path="/p/:slug" element={<PotPage />} />
               <Route path="/thank-you" element={<ThankYou />} />
               <Route path="/admin/login" element={<AdminLogin />} />
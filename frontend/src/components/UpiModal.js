@@ -2,7 +2,7 @@ import { useState, useEffect, useRef } from "react";
 import { useNavigate } from "react-router-dom";
 import { QRCodeSVG } from "qrcode.react";
 import confetti from "canvas-confetti";
-import { createUpiSession, confirmBlessing, getConfig } from "../lib/api";
+import { createUpiSession, confirmBlessing } from "../lib/api";
 import { useCart } from "../context/CartContext";
 import { useDataPrefetch } from "../context/DataPrefetchContext";
 import { Button } from "../components/ui/button";
@@ -81,27 +81,17 @@ export default function UpiModal({ isOpen, onClose, allocations, totalPaise, pot
     setIsMobile(mobile);
   }, []);
 
-  // Fetch UPI config when modal opens
+  // Create the session when the modal opens; it also carries the current payee UPI ID
   useEffect(() => {
-    if (isOpen) {
-      getConfig()
+    if (isOpen && !sessionId && !creating) {
+      setCreating(true);
+      createUpiSession({ allocations })
         .then(res => {
+          setSessionId(res.data.session_id);
           if (res.data.upi_id) {
-            setUpiConfig({
-              upi_id: res.data.upi_id,
-              upi_name: res.data.upi_name || "Wedding Gift"
-            });
+            setUpiConfig({ upi_id: res.data.upi_id, upi_name: res.data.upi_name || "Wedding Gift" });
           }
         })
-        .catch(() => {});
-    }
-  }, [isOpen]);
-
-  useEffect(() => {
-    if (isOpen && !sessionId && !creating) {
-      setCreating(true);
-      createUpiSession({ allocations })
-        .then(res => setSessionId(res.data.session_id))
         .catch(() => { toast.error("Could not start. Please try again."); onClose(); })
         .finally(() => setCreating(false));
     }
@@ -1,5 +1,5 @@
 import { createContext, useContext, useState, useEffect, useCallback, useRef } from 'react';
-import { fetchPots, fetchAllBlessings } from '../lib/api';
+import { fetchPots, fetchBlessings, potsStreamUrl } from '../lib/api';
 
 const DataPrefetchContext = createContext();
 
@@ -9,10 +9,77 @@ export function DataPrefetchProvider({ children }) {
   const [potsLoading, setPotsLoading] = useState(true);
   const [wishesLoading, setWishesLoading] = useState(true);
   const [potsError, setPotsError] = useState(null);
+  const [wishesTotal, setWishesTotal] = useState(null);
+  const [wishesNextCursor, setWishesNextCursor] = useState(null);
+  const [wishesLoadingMore, setWishesLoadingMore] = useState(false);
   
   // Track last fetch time to avoid unnecessary refetches
   const lastFetchRef = useRef(0);
   const CACHE_DURATION = 30000; // 30 seconds - short enough to get fresh data
+  const WISHES_POLL_INTERVAL = 30000; // fallback when no payment event arrives over the stream
+  const WISHES_EVENT_SPREAD = 5000; // payment events reach every client: spread their polls over this long
+
+  // Newest wish we have - the wall only ever asks for what came after it
+  const latestWishRef = useRef(null);
+
+  // First screen of wishes (newest first)
+  const loadWishes = useCallback(() => {
+    setWishesLoading(true);
+    return fetchBlessings()
+      .then(r => {
+        latestWishRef.current = r.data.latest_cursor;
+        setWishesData(r.data.items);
+        setWishesTotal(r.data.total);
+        setWishesNextCursor(r.data.next_cursor);
+      })
+      .catch(() => {}) // Silently fail for wishes
+      .finally(() => setWishesLoading(false));
+  }, []);
+
+  const wishesPollRef = useRef(null);
+  const wishesPollTimerRef = useRef(null);
+
+  // Prepend only the wishes that arrived since the newest one shown (one request at a time)
+  const pollWishes = useCallback(() => {
+    if (!latestWishRef.current) return loadWishes();
+    if (wishesPollRef.current) return wishesPollRef.current;
+    wishesPollRef.current = fetchBlessings({ since: latestWishRef.current, limit: 100 })
+      .then(r => {
+        if (r.data.reset) return loadWishes();
+        latestWishRef.current = r.data.latest_cursor;
+        setWishesTotal(r.data.total);
+        if (r.data.items.length === 0) return;
+        setWishesData(prev => {
+          const ids = new Set(r.data.items.map(w => w.id));
+          return [...r.data.items, ...(prev || []).filter(w => !ids.has(w.id))];
+        });
+      })
+      .catch(() => {})
+      .finally(() => { wishesPollRef.current = null; });
+    return wishesPollRef.current;
+  }, [loadWishes]);
+
+  // Coalesce a burst of payment events into one poll, at a random point so clients don't all ask at once
+  const schedulePollWishes = useCallback(() => {
+    if (wishesPollTimerRef.current || document.hidden) return;
+    wishesPollTimerRef.current = setTimeout(() => {
+      wishesPollTimerRef.current = null;
+      pollWishes();
+    }, 1000 + Math.random() * WISHES_EVENT_SPREAD);
+  }, [pollWishes]);
+
+  // Older wishes, one page at a time
+  const loadMoreWishes = useCallback(() => {
+    if (!wishesNextCursor || wishesLoadingMore) return;
+    setWishesLoadingMore(true);
+    fetchBlessings({ cursor: wishesNextCursor })
+      .then(r => {
+        setWishesData(prev => [...(prev || []), ...r.data.items]);
+        setWishesNextCursor(r.data.next_cursor);
+      })
+      .catch(() => {})
+      .finally(() => setWishesLoadingMore(false));
+  }, [wishesNextCursor, wishesLoadingMore]);
 
   // Fetch function that can be called on app load or to refresh
   const fetchAllData = useCallback(async (force = false) => {
@@ -37,13 +104,9 @@ export function DataPrefetchProvider({ children }) {
       })
       .finally(() => setPotsLoading(false));
 
-    // Fetch wishes  
-    setWishesLoading(true);
-    fetchAllBlessings()
-      .then(r => setWishesData(r.data))
-      .catch(() => {}) // Silently fail for wishes
-      .finally(() => setWishesLoading(false));
-  }, [potsData]);
+    // Fetch wishes - just the new ones if the wall is already loaded
+    pollWishes();
+  }, [potsData, pollWishes]);
 
   // Prefetch data on app load
   useEffect(() => {
@@ -51,6 +114,38 @@ export function DataPrefetchProvider({ children }) {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, []);
 
+  // Live pot progress - merge SSE deltas into the prefetched pots
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') return;
+    const source = new EventSource(potsStreamUrl);
+    const applyProgress = (e) => {
+      const progress = JSON.parse(e.data);
+      setPotsData(prev => prev && prev.map(pot => (
+        progress[pot.id] ? { ...pot, ...progress[pot.id] } : pot
+      )));
+    };
+    source.addEventListener('snapshot', applyProgress);
+    source.addEventListener('pots', applyProgress);
+    // A payment just landed - it may carry a new wish
+    source.addEventListener('pots', schedulePollWishes);
+    return () => {
+      source.close();
+      clearTimeout(wishesPollTimerRef.current);
+      wishesPollTimerRef.current = null;
+    };
+  }, [schedulePollWishes]);
+
+  // Keep the wall current even without the stream; hidden tabs catch up when shown
+  useEffect(() => {
+    const timer = setInterval(() => { if (!document.hidden) pollWishes(); }, WISHES_POLL_INTERVAL);
+    const onVisible = () => { if (!document.hidden) pollWishes(); };
+    document.addEventListener('visibilitychange', onVisible);
+    return () => {
+      clearInterval(timer);
+      document.removeEventListener('visibilitychange', onVisible);
+    };
+  }, [pollWishes]);
+
   // Force refresh - clears cache timestamp and fetches fresh
   const refreshData = useCallback(() => {
     lastFetchRef.current = 0; // Reset cache
@@ -61,6 +156,9 @@ export function DataPrefetchProvider({ children }) {
   const clearPrefetchedData = useCallback(() => {
     setPotsData(null);
     setWishesData(null);
+    setWishesTotal(null);
+    setWishesNextCursor(null);
+    latestWishRef.current = null;
     lastFetchRef.current = 0;
   }, []);
 
@@ -70,6 +168,10 @@ export function DataPrefetchProvider({ children }) {
       wishesData,
       potsLoading,
       wishesLoading,
+      wishesTotal,
+      wishesNextCursor,
+      wishesLoadingMore,
+      loadMoreWishes,
       potsError,
       refreshData,
       clearPrefetchedData,
@@ -14,10 +14,14 @@ export const fetchPots = () => api.get('/pots');
 export const fetchPot = (slug) => api.get(`/pots/${slug}`);
 export const fetchContributors = (slug) => api.get(`/pots/${slug}/contributors`);
 export const fetchAllBlessings = () => api.get('/blessings/all');
+export const fetchBlessings = (params = {}) => api.get('/blessings', { params });
+export const potsStreamUrl = `${API}/pots/stream`;
+export const liveSocketUrl = `${API.replace(/^http/, 'ws')}/live`;
 export const createSession = (data) => api.post('/session/create-or-update', data);
 export const createOrder = (data) => api.post('/razorpay/order/create', data);
 export const createPaymentLink = (data) => api.post('/razorpay/payment-link', data);
 export const pollSession = (id) => api.get(`/session/${id}`);
+export const waitForSession = (id, status, timeout = 25) => api.get(`/session/${id}/wait`, { params: { status, timeout } });
 export const getSessionProgress = (id) => api.get(`/session/${id}/progress`);
 export const createUpiSession = (data) => api.post('/upi/session/create', data);
 export const confirmBlessing = (data) => api.post('/upi/blessing/confirm', data);
@@ -32,7 +36,7 @@ export const archivePot = (id) => api.post(`/admin/pots/${id}/archive`);
 export const addPotItem = (potId, data) => api.post(`/admin/pots/${potId}/items`, data);
 export const updatePotItem = (id, data) => api.put(`/admin/pot-items/${id}`, data);
 export const deletePotItem = (id) => api.delete(`/admin/pot-items/${id}`);
-export const fetchContributions = () => api.get('/admin/contributions');
-export const exportContributions = () => api.get('/admin/contributions/export', { responseType: 'blob' });
+export const fetchContributions = (params = {}) => api.get('/admin/contributions', { params });
+export const exportContributions = (params = {}) => api.get('/admin/contributions/export', { params, responseType: 'blob' });
 export const fetchSettings = () => api.get('/admin/settings');
 export const updateSettings = (data) => api.put('/admin/settings', data);
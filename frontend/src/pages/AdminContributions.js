@@ -1,25 +1,61 @@
 import { useState, useEffect, useMemo } from "react";
 import { Link } from "react-router-dom";
-import { fetchContributions, exportContributions, updateContributionStatus } from "../lib/api";
+import { fetchContributions, fetchAdminPots, exportContributions, updateContributionStatus } from "../lib/api";
 import { Button } from "../components/ui/button";
 import { Download, CheckCircle, XCircle, Loader2, ArrowLeft, ArrowUpDown, ArrowUp, ArrowDown } from "lucide-react";
 import { toast } from "sonner";
 
+const EMPTY_FILTERS = { status: "", pot_id: "", payment_method: "", created_from: "", created_to: "", q: "" };
+
 export default function AdminContributions() {
   const [contributions, setContributions] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [filters, setFilters] = useState(EMPTY_FILTERS);
+  const [pots, setPots] = useState([]);
   const [updating, setUpdating] = useState(null);
+  const [exportBreakdown, setExportBreakdown] = useState(false);
   const [sortConfig, setSortConfig] = useState({ key: "created_at", direction: "desc" });
 
+  // Filters are applied by the server; empty ones are left out of the query
+  function queryParams(cursor) {
+    const params = Object.fromEntries(Object.entries(filters).filter(([, v]) => v));
+    return cursor ? { ...params, cursor } : params;
+  }
+
   async function load() {
     try {
-      const res = await fetchContributions();
+      const res = await fetchContributions(queryParams());
       setContributions(res.data);
+      setNextCursor(res.headers["x-next-cursor"] || null);
     } catch { toast.error("Failed to load contributions"); }
     setLoading(false);
   }
 
-  useEffect(() => { load(); }, []);
+  async function loadMore() {
+    setLoadingMore(true);
+    try {
+      const res = await fetchContributions(queryParams(nextCursor));
+      setContributions(prev => [...prev, ...res.data]);
+      setNextCursor(res.headers["x-next-cursor"] || null);
+    } catch { toast.error("Failed to load more contributions"); }
+    setLoadingMore(false);
+  }
+
+  useEffect(() => {
+    fetchAdminPots().then(r => setPots(r.data)).catch(() => {});
+  }, []);
+
+  // Debounced so typing in the search box doesn't fire a request per keystroke
+  useEffect(() => {
+    const timer = setTimeout(load, 300);
+    return () => clearTimeout(timer);
+  }, [filters]);
+
+  function setFilter(key, value) {
+    setFilters(prev => ({ ...prev, [key]: value }));
+  }
 
   // Sorting logic
   const sortedContributions = useMemo(() => {
@@ -75,7 +111,7 @@ export default function AdminContributions() {
 
   async function handleExport() {
     try {
-      const res = await exportContributions();
+      const res = await exportContributions(exportBreakdown ? { breakdown: true } : {});
       const url = window.URL.createObjectURL(new Blob([res.data]));
       const a = document.createElement("a"); a.href = url;
       a.download = `contributions-${new Date().toISOString().split("T")[0]}.csv`;
@@ -105,11 +141,49 @@ export default function AdminContributions() {
         <div className="flex justify-between items-center mb-6">
           <div>
             <h1 className="text-2xl font-bold" data-testid="admin-contributions-title">Contributions</h1>
-            <p className="text-sm text-gray-500 mt-1">Click column headers to sort</p>
+            <p className="text-sm text-gray-500 mt-1">Click column headers to sort the loaded rows</p>
           </div>
-          <Button onClick={handleExport} variant="outline" size="sm" data-testid="export-csv-btn">
-            <Download className="w-4 h-4 mr-2" /> Export CSV
-          </Button>
+          <div className="flex items-center gap-3">
+            <label className="flex items-center gap-1.5 text-sm text-gray-600">
+              <input type="checkbox" checked={exportBreakdown} onChange={e => setExportBreakdown(e.target.checked)}
+                data-testid="export-breakdown-toggle" />
+              Per-pot columns
+            </label>
+            <Button onClick={handleExport} variant="outline" size="sm" data-testid="export-csv-btn">
+              <Download className="w-4 h-4 mr-2" /> Export CSV
+            </Button>
+          </div>
+        </div>
+
+        <div className="flex flex-wrap gap-2 mb-4 text-sm" data-testid="contributions-filters">
+          <input
+            type="search" placeholder="Donor name or phone" value={filters.q}
+            onChange={e => setFilter("q", e.target.value)}
+            className="border rounded px-3 py-1.5 bg-white w-56" data-testid="filter-search"
+          />
+          <select value={filters.status} onChange={e => setFilter("status", e.target.value)}
+            className="border rounded px-2 py-1.5 bg-white" data-testid="filter-status">
+            <option value="">All statuses</option>
+            {["created", "pending", "paid", "failed"].map(s => <option key={s} value={s}>{s}</option>)}
+          </select>
+          <select value={filters.pot_id} onChange={e => setFilter("pot_id", e.target.value)}
+            className="border rounded px-2 py-1.5 bg-white" data-testid="filter-pot">
+            <option value="">All pots</option>
+            {pots.map(p => <option key={p.id} value={p.id}>{p.title}</option>)}
+          </select>
+          <select value={filters.payment_method} onChange={e => setFilter("payment_method", e.target.value)}
+            className="border rounded px-2 py-1.5 bg-white" data-testid="filter-method">
+            <option value="">All methods</option>
+            <option value="razorpay">Razorpay</option>
+            <option value="upi">UPI</option>
+          </select>
+          <input type="date" value={filters.created_from} onChange={e => setFilter("created_from", e.target.value)}
+            className="border rounded px-2 py-1.5 bg-white" data-testid="filter-from" />
+          <input type="date" value={filters.created_to} onChange={e => setFilter("created_to", e.target.value)}
+            className="border rounded px-2 py-1.5 bg-white" data-testid="filter-to" />
+          {Object.values(filters).some(Boolean) && (
+            <Button variant="ghost" size="sm" onClick={() => setFilters(EMPTY_FILTERS)}>Clear</Button>
+          )}
         </div>
 
         {loading ? (
@@ -224,6 +298,13 @@ export default function AdminContributions() {
                 ))}
               </tbody>
             </table>
+            {nextCursor && (
+              <div className="flex justify-center p-4 border-t">
+                <Button variant="outline" size="sm" onClick={loadMore} disabled={loadingMore} data-testid="load-more-btn">
+                  {loadingMore ? <Loader2 className="w-4 h-4 animate-spin" /> : "Load more"}
+                </Button>
+              </div>
+            )}
           </div>
         )}
       </main>
@@ -62,6 +62,12 @@ export default function AdminDashboard() {
       <main className="max-w-5xl mx-auto px-4 py-8">
         <h1 className="font-serif text-2xl text-foreground mb-6" data-testid="dashboard-title">Dashboard</h1>
 
+        {data?.errors && Object.keys(data.errors).length > 0 && (
+          <p className="mb-6 text-sm font-sans text-crimson" data-testid="dashboard-partial-warning">
+            Some data could not be loaded ({Object.keys(data.errors).join(", ")}). Refresh to try again.
+          </p>
+        )}
+
         {/* Stats Cards */}
         <div className="grid grid-cols-1 sm:grid-cols-3 gap-4 mb-8">
           <Card className="gold-border bg-card" data-testid="total-collected-card">
@@ -7,7 +7,7 @@ import HeritageNav from "../components/HeritageNav";
 import { Heart, Quote } from "lucide-react";
 
 // Wishes Wall Component
-function WishesWall({ wishes, loading }) {
+function WishesWall({ wishes, loading, hasMore, loadingMore, onLoadMore }) {
   if (loading) {
     return (
       <div className="flex justify-center py-12">
@@ -29,7 +29,7 @@ function WishesWall({ wishes, loading }) {
     <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-4">
       {wishes.map((wish, i) => (
         <div 
-          key={i} 
+          key={wish.id || i} 
           className="group relative bg-white/80 backdrop-blur-sm rounded-lg p-5 shadow-sm border border-gold/10 hover:border-gold/30 hover:shadow-md transition-all duration-300"
           style={{ animationDelay: `${i * 0.05}s` }}
         >
@@ -69,6 +69,18 @@ function WishesWall({ wishes, loading }) {
           )}
         </div>
       ))}
+      {hasMore && (
+        <div className="col-span-full flex justify-center pt-2">
+          <button
+            onClick={onLoadMore}
+            disabled={loadingMore}
+            className="text-sm font-serif text-gold hover:text-crimson transition-colors disabled:opacity-50"
+            data-testid="load-more-wishes"
+          >
+            {loadingMore ? "Loading..." : "Show more wishes"}
+          </button>
+        </div>
+      )}
     </div>
   );
 }
@@ -80,6 +92,10 @@ export default function BlessingsPage() {
     wishesData, 
     potsLoading, 
     wishesLoading, 
+    wishesTotal,
+    wishesNextCursor,
+    wishesLoadingMore,
+    loadMoreWishes,
     potsError,
     refreshData 
   } = useDataPrefetch();
@@ -96,6 +112,7 @@ export default function BlessingsPage() {
   const wishes = wishesData || [];
   const loading = potsLoading && !potsData; // Show loading only if no cached data
   const wishesLoadingState = wishesLoading && !wishesData;
+  const wishCount = wishesTotal ?? wishes.length;
   const error = potsError;
 
   return (
@@ -175,14 +192,20 @@ export default function BlessingsPage() {
             <p className="text-muted-foreground text-sm sm:text-base font-sans">
               Heartfelt wishes from our loved ones
             </p>
-            {wishes.length > 0 && (
+            {wishCount > 0 && (
               <p className="text-gold text-sm mt-2 font-serif">
-                {wishes.length} {wishes.length === 1 ? 'wish' : 'wishes'} received
+                {wishCount} {wishCount === 1 ? 'wish' : 'wishes'} received
               </p>
             )}
           </div>
           
-          <WishesWall wishes={wishes} loading={wishesLoadingState} />
+          <WishesWall
+            wishes={wishes}
+            loading={wishesLoadingState}
+            hasMore={!!wishesNextCursor}
+            loadingMore={wishesLoadingMore}
+            onLoadMore={loadMoreWishes}
+          />
         </section>
       </main>
 
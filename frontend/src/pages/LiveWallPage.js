@@ -0,0 +1,117 @@
+import { useEffect, useState } from "react";
+import { useDataPrefetch } from "../context/DataPrefetchContext";
+import { liveSocketUrl } from "../lib/api";
+import { Heart } from "lucide-react";
+
+const MAX_WISHES = 12;
+
+// Venue display: pot progress and incoming wishes pushed over /api/live
+export default function LiveWallPage() {
+  const { potsData } = useDataPrefetch();
+  const [progress, setProgress] = useState({});
+  const [wishes, setWishes] = useState([]);
+  const [connected, setConnected] = useState(false);
+
+  useEffect(() => {
+    let socket;
+    let retryTimer;
+    let retryDelay = 1000;
+    let stopped = false;
+
+    const connect = () => {
+      socket = new WebSocket(liveSocketUrl);
+      socket.onopen = () => {
+        setConnected(true);
+        retryDelay = 1000;
+      };
+      socket.onmessage = (e) => {
+        const { type, data } = JSON.parse(e.data);
+        if (type === "snapshot") {
+          setProgress(data.pots);
+          setWishes(data.blessings.slice(0, MAX_WISHES));
+        } else if (type === "pots") {
+          setProgress(prev => ({ ...prev, ...data }));
+        } else if (type === "blessing") {
+          setWishes(prev => [data, ...prev.filter(w => w.id !== data.id)].slice(0, MAX_WISHES));
+        } else if (type === "blessing_removed") {
+          setWishes(prev => prev.filter(w => w.id !== data.id));
+        }
+      };
+      // Reconnect (fresh snapshot) after network drops or being shed as too slow
+      socket.onclose = () => {
+        setConnected(false);
+        if (stopped) return;
+        retryTimer = setTimeout(connect, retryDelay);
+        retryDelay = Math.min(retryDelay * 2, 30000);
+      };
+    };
+
+    connect();
+    return () => {
+      stopped = true;
+      clearTimeout(retryTimer);
+      socket?.close();
+    };
+  }, []);
+
+  const pots = (potsData || []).map(pot => ({ ...pot, ...progress[pot.id] }));
+
+  return (
+    <div className="min-h-screen bg-crimson text-white px-8 py-10" data-testid="live-wall">
+      <header className="text-center mb-10">
+        <h1 className="font-signature text-6xl sm:text-7xl mb-3">Shvetha & Aadi</h1>
+        <p className="text-gold uppercase tracking-[0.3em] text-xs font-sans font-semibold">
+          Gifts & Wishes {connected ? "" : "· reconnecting"}
+        </p>
+      </header>
+
+      <div className="grid grid-cols-1 lg:grid-cols-2 gap-10 max-w-6xl mx-auto">
+        {/* Pot progress */}
+        <section className="space-y-6">
+          {pots.map(pot => {
+            const raised = (pot.total_raised_paise || 0) / 100;
+            const goal = pot.goal_amount_paise ? pot.goal_amount_paise / 100 : null;
+            return (
+              <div key={pot.id} data-testid={`live-pot-${pot.slug}`}>
+                <div className="flex justify-between items-baseline mb-2">
+                  <span className="font-serif text-xl">{pot.title}</span>
+                  <span className="text-gold font-serif">
+                    {"₹"}{raised.toLocaleString('en-IN')}
+                    {goal && <span className="text-champagne/60 text-sm"> of {"₹"}{goal.toLocaleString('en-IN')}</span>}
+                  </span>
+                </div>
+                {goal && (
+                  <div className="brass-groove">
+                    <div className="brass-fill" style={{ width: `${Math.min((raised / goal) * 100, 100)}%` }} />
+                  </div>
+                )}
+                <p className="text-xs text-champagne/60 mt-1">
+                  {pot.contributor_count || 0} {pot.contributor_count === 1 ? "wish" : "wishes"}
+                </p>
+              </div>
+            );
+          })}
+        </section>
+
+        {/* Incoming wishes */}
+        <section className="space-y-4">
+          {wishes.length === 0 && (
+            <p className="text-center text-champagne/70 font-serif italic py-12">Wishes will appear here as they arrive</p>
+          )}
+          {wishes.map(wish => (
+            <div key={wish.id} className="bg-white/10 rounded-lg p-4 border border-gold/20 animate-fade-in">
+              <p className="font-serif text-lg text-gold">{wish.donor_name}</p>
+              {wish.donor_message ? (
+                <p className="text-champagne/90 italic mt-1">"{wish.donor_message}"</p>
+              ) : (
+                <p className="flex items-center gap-2 text-champagne/60 text-sm italic mt-1">
+                  <Heart className="w-4 h-4" /> Sent their wishes
+                </p>
+              )}
+            </div>
+          ))}
+        </section>
+      </div>
+    </div>
+  );
+}
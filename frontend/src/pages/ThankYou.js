@@ -1,6 +1,6 @@
-import { useState, useEffect, useRef } from "react";
+import { useState, useEffect } from "react";
 import { useSearchParams, useNavigate, Link } from "react-router-dom";
-import { pollSession, getSessionProgress } from "../lib/api";
+import { pollSession, waitForSession, getSessionProgress } from "../lib/api";
 import { Heart } from "lucide-react";
 
 // Format number in Indian style (₹2,45,000)
@@ -23,8 +23,6 @@ export default function ThankYou() {
   const [animatedRaised, setAnimatedRaised] = useState(0);
   const [progressPercent, setProgressPercent] = useState(0);
   const [animationComplete, setAnimationComplete] = useState(false);
-  
-  const pollRef = useRef(null);
 
   // Fetch progress data for animation
   useEffect(() => {
@@ -92,22 +90,21 @@ export default function ThankYou() {
     return () => clearTimeout(timer);
   }, [progressData]);
 
-  // Poll for payment confirmation
+  // Wait for payment confirmation (long-poll, woken by the server when the session is paid)
   useEffect(() => {
     if (!sessionId) return;
-    let attempts = 0;
-    pollRef.current = setInterval(async () => {
-      attempts++;
+    let cancelled = false;
+    const watch = async () => {
       try {
-        const res = await pollSession(sessionId);
-        if (res.data.status === "paid") {
-          setConfirmed(true);
-          clearInterval(pollRef.current);
+        let res = await pollSession(sessionId);
+        for (let attempts = 0; !cancelled && res.data.status !== "paid" && attempts < 2; attempts++) {
+          res = await waitForSession(sessionId, res.data.status);
         }
+        if (!cancelled && res.data.status === "paid") setConfirmed(true);
       } catch { /* ignore */ }
-      if (attempts > 15) clearInterval(pollRef.current);
-    }, 2000);
-    return () => clearInterval(pollRef.current);
+    };
+    watch();
+    return () => { cancelled = true; };
   }, [sessionId]);
 
   // Highlight the back button after 10 seconds